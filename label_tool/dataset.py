@@ -0,0 +1,275 @@
+"""
+Dataset Module
+
+Streams the labelled frames of a video together with their rois and events in batches, e.g. for
+training pipelines. The frames are decoded in one sequential pass, unlabelled gaps are skipped
+with grab() instead of seeking per frame.
+
+Example:
+    for batch in LabelBatches("video.avi", "labels.json", "config.json", batch_size=16, prefetch=4):
+        train_step(batch["frames"], batch["rois"], batch["roi_counts"], batch["events"])
+"""
+import json
+import multiprocessing
+import numpy as np
+
+from util.frame_source import open_frame_source
+from util.results_file import load_results, FRAME_SPACE, SOURCE_SPACE
+from util.transform_image import resize_image
+
+
+def _plan_frames(results, events, frame_count, frames):
+    """
+    Get the sorted frames, which have to be decoded.
+
+    Arguments:
+        results {dict} -- entries without event per frame index
+        events {EventIntervals} -- event intervals
+        frame_count {int} -- number of frames of the video
+        frames {string or list} -- "labeled" (rois or event), "rois" (only frames with rois) or frame indices
+
+    Returns:
+        numpy array -- sorted frame indices
+    """
+
+    if frames == "labeled" or frames == "rois":
+        planned = [np.array(sorted(frame for frame, entry in results.items() if entry.get("rois")), dtype=np.int64)]
+
+        if frames == "labeled":
+            planned += [np.arange(start, end, dtype=np.int64) for start, end, _ in events.spans()]
+
+        planned = np.unique(np.concatenate(planned))
+    else:
+        planned = np.unique(np.asarray(list(frames), dtype=np.int64))
+
+    return planned[(planned >= 0) & (planned < frame_count)]
+
+
+def _make_batch(indices, frames, results, events, event_names, max_rois, scale=(1.0, 1.0)):
+    """
+    Stack the frames and labels of a batch into arrays.
+
+    Arguments:
+        indices {list} -- frame indices
+        frames {list} -- frames
+        results {dict} -- entries without event per frame index
+        events {EventIntervals} -- event intervals
+        event_names {list} -- events of the config
+        max_rois {int} -- number of roi slots per frame or None for the maximum of the batch
+
+    Keyword Arguments:
+        scale {tuple} -- (x, y) factors from the space of the stored rois into the frames (default: {(1.0, 1.0)})
+
+    Returns:
+        dict -- batch
+    """
+
+    rois = [(results.get(index) or {}).get("rois") or [] for index in indices]
+
+    if max_rois is None:
+        max_rois = max(len(frame_rois) for frame_rois in rois)
+
+    roi_array = np.zeros((len(indices), max_rois, 4), np.float32)
+    roi_counts = np.zeros(len(indices), np.int64)
+
+    for i, frame_rois in enumerate(rois):
+        frame_rois = frame_rois[:max_rois]
+
+        if frame_rois:
+            roi_array[i, :len(frame_rois)] = frame_rois
+
+        roi_counts[i] = len(frame_rois)
+
+    roi_array[:, :, 0::2] *= scale[0]
+    roi_array[:, :, 1::2] *= scale[1]
+
+    event_array = np.array([event_names.index(events.get(index)) if events.get(index) in event_names else -1
+                            for index in indices], dtype=np.int64)
+
+    return {
+        "frame_indices": np.array(indices, dtype=np.int64),
+        "frames": np.stack(frames),
+        "rois": roi_array,
+        "roi_counts": roi_counts,
+        "events": event_array,
+    }
+
+
+def _generate_batches(video_path, config, image_func, results, events, planned, batch_size, max_rois, max_grab_gap, roi_space):
+    """
+    Decode the planned frames in one pass and yield them in batches. Rois in source pixels are
+    scaled into the converted frames.
+
+    Yields:
+        dict -- batch
+    """
+
+    indices, frames = [], []
+    scale = (1.0, 1.0)
+
+    with open_frame_source(video_path, config.get("fps"), max_grab_gap) as source:
+        for index in planned:
+            ret, frame = source.read(int(index))
+
+            if not ret:
+                break
+
+            height, width = frame.shape[:2]
+
+            if image_func:
+                frame = image_func(config, frame)
+
+            if roi_space == SOURCE_SPACE:
+                scale = (frame.shape[1] / width, frame.shape[0] / height)
+
+            indices.append(int(index))
+            frames.append(frame)
+
+            if len(indices) == batch_size:
+                yield _make_batch(indices, frames, results, events, config["events"], max_rois, scale)
+                indices, frames = [], []
+
+    if indices:
+        yield _make_batch(indices, frames, results, events, config["events"], max_rois, scale)
+
+
+def _produce_batches(arguments, batch_queue):
+    """
+    Worker process, which puts the batches into a bounded queue. The end is marked with None, an
+    exception is passed to the consumer.
+
+    Arguments:
+        arguments {tuple} -- arguments of _generate_batches
+        batch_queue {Queue} -- bounded queue
+    """
+
+    try:
+        for batch in _generate_batches(*arguments):
+            batch_queue.put(batch)
+    except Exception as exception:
+        batch_queue.put(exception)
+        return
+
+    batch_queue.put(None)
+
+
+class LabelBatches:
+    """
+    LabelBatches class, an iterable over batches of the labelled frames of a video. Every batch is
+    a dict of NumPy arrays:
+    - frame_indices: (n,) frame indices
+    - frames: (n, height, width, 3) converted frames
+    - rois: (n, max_rois, 4) rois [x, y, w, h] in the space of the converted frames (rois in source pixels are scaled), padded with zeros
+    - roi_counts: (n,) number of valid rois per frame
+    - events: (n,) index of the event in the events of the config or -1
+    """
+
+    def __init__(self, video_path, results_path, config_path, image_func=resize_image, batch_size=32, frames="labeled",
+                 max_rois=None, max_grab_gap=None, prefetch=0):
+        """
+        LabelBatches constructor.
+
+        Arguments:
+            video_path {string} -- path to video file, image directory or .npy file
+            results_path {string} -- path to results file of the label tool
+            config_path {string} -- path to config file
+
+        Keyword Arguments:
+            image_func {python function} -- function that somehow converts the image, like in the label tool (default: {resize_image})
+            batch_size {int} -- number of frames per batch (default: {32})
+            frames {string or list} -- "labeled" (rois or event), "rois" (only frames with rois) or frame indices (default: {"labeled"})
+            max_rois {int} -- number of roi slots per frame, further rois are dropped (default: {maximum of each batch})
+            max_grab_gap {int} -- larger gaps are skipped by seeking instead of grab() (default: {None, never seek})
+            prefetch {int} -- number of batches, which a worker process decodes ahead, 0 decodes in the calling process (default: {0})
+
+        Raises:
+            ValueError: the rois are stored in the pixels of converted frames, but image_func is None.
+        """
+
+        with open(config_path, "r") as read_file:
+            self._config = json.load(read_file)
+
+        self._video_path = video_path
+        self._image_func = image_func
+        self._batch_size = batch_size
+        self._max_rois = max_rois
+        self._max_grab_gap = max_grab_gap if max_grab_gap is not None else float("inf")
+        self._prefetch = prefetch
+
+        self._results, self._events, _, self._roi_space = load_results(results_path)
+
+        # rois of the converted frames can not be mapped back into the source
+        if self._roi_space == FRAME_SPACE and image_func is None:
+            raise ValueError("the rois in {} are stored in the pixels of the converted frames, pass the image_func of the label tool".format(results_path))
+
+        with open_frame_source(video_path, self._config.get("fps")) as source:
+            frame_count = source.frame_count
+
+        self._planned = _plan_frames(self._results, self._events, frame_count, frames)
+
+    @property
+    def events(self):
+        """
+        Events getter.
+
+        Returns:
+            list -- events of the config, the event arrays index into it
+        """
+
+        return list(self._config["events"])
+
+    @property
+    def frame_indices(self):
+        """
+        Planned frames getter.
+
+        Returns:
+            numpy array -- sorted indices of the frames, which are decoded
+        """
+
+        return self._planned.copy()
+
+    def __len__(self):
+        """
+        Get the number of batches.
+
+        Returns:
+            int -- number of batches
+        """
+
+        return -(-len(self._planned) // self._batch_size)
+
+    def __iter__(self):
+        """
+        Iterate over the batches.
+
+        Yields:
+            dict -- batch
+        """
+
+        arguments = (self._video_path, self._config, self._image_func, self._results, self._events,
+                     self._planned, self._batch_size, self._max_rois, self._max_grab_gap, self._roi_space)
+
+        if self._prefetch <= 0:
+            yield from _generate_batches(*arguments)
+            return
+
+        batch_queue = multiprocessing.Queue(maxsize=self._prefetch)
+        worker = multiprocessing.Process(target=_produce_batches, args=(arguments, batch_queue), daemon=True)
+        worker.start()
+
+        try:
+            while True:
+                batch = batch_queue.get()
+
+                if batch is None:
+                    break
+
+                if isinstance(batch, Exception):
+                    raise batch
+
+                yield batch
+        finally:
+            # the consumer can stop early, so the worker may still wait on the full queue
+            worker.terminate()
+            worker.join()
@@ -0,0 +1,425 @@
+"""
+Display Module
+
+Display backends own the windows, the key input and the mouse callbacks of the label tool. The
+OpenCV backend shows real windows. The recording backend wraps it and writes every key press and
+mouse event into a script, which the headless replay backend plays back without any window, e.g.
+to benchmark the interactive loop on a machine without display.
+"""
+import json
+import time
+import cv2 as cv
+import numpy as np
+
+# key codes, which are reported by name
+KEY_NAMES = {9: "TAB", 32: "SPACE"}
+
+
+def key_name(key):
+    """
+    Get a readable name of a key code.
+
+    Arguments:
+        key {int} -- key code
+
+    Returns:
+        string -- name of the key
+    """
+
+    key &= 0xFF
+
+    if key in KEY_NAMES:
+        return KEY_NAMES[key]
+
+    if 33 <= key <= 126:
+        return chr(key)
+
+    return str(key)
+
+
+class Display:
+    """
+    Display class, the interface of all display backends. It mirrors the used part of the
+    OpenCV HighGUI api.
+    """
+
+    def named_window(self, name):
+        """
+        Create a window.
+
+        Arguments:
+            name {string} -- window name
+        """
+
+        raise NotImplementedError
+
+    def show(self, name, image):
+        """
+        Show an image in a window.
+
+        Arguments:
+            name {string} -- window name
+            image {opencv image} -- image
+        """
+
+        raise NotImplementedError
+
+    def wait_key(self, delay):
+        """
+        Process window events (e.g. mouse callbacks) and wait for a key press.
+
+        Arguments:
+            delay {int} -- maximum waiting time in ms
+
+        Returns:
+            int -- key code or -1 if no key was pressed
+        """
+
+        raise NotImplementedError
+
+    def set_mouse_callback(self, name, callback, param=None):
+        """
+        Set the mouse callback of a window.
+
+        Arguments:
+            name {string} -- window name
+            callback {python function} -- function (event, x, y, flags, param)
+
+        Keyword Arguments:
+            param {object} -- passed to the callback (default: {None})
+        """
+
+        raise NotImplementedError
+
+    def destroy_window(self, name):
+        """
+        Close a window.
+
+        Arguments:
+            name {string} -- window name
+        """
+
+        raise NotImplementedError
+
+    def destroy_all_windows(self):
+        """
+        Close all windows.
+        """
+
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Finish the session of the display, e.g. write a recording.
+        """
+
+
+class OpenCVDisplay(Display):
+    """
+    OpenCVDisplay class, which shows the windows with OpenCV HighGUI.
+    """
+
+    def named_window(self, name):
+        cv.namedWindow(name)
+
+    def show(self, name, image):
+        cv.imshow(name, image)
+
+    def wait_key(self, delay):
+        return cv.waitKey(delay)
+
+    def set_mouse_callback(self, name, callback, param=None):
+        cv.setMouseCallback(name, callback, param)
+
+    def destroy_window(self, name):
+        cv.destroyWindow(name)
+
+    def destroy_all_windows(self):
+        cv.destroyAllWindows()
+
+
+class RecordingDisplay(Display):
+    """
+    RecordingDisplay class, which passes everything to another display and records the key
+    presses and mouse events of the session into a script for the ReplayDisplay. Every input is
+    stored with the number of the wait_key call, during which it happened, so that the replay
+    delivers it at the same point of the loop.
+    """
+
+    def __init__(self, path, display=None):
+        """
+        RecordingDisplay constructor.
+
+        Arguments:
+            path {string} -- path of the script
+
+        Keyword Arguments:
+            display {Display} -- display, which shows the windows (default: {OpenCVDisplay})
+        """
+
+        self._path = path
+        self._display = display or OpenCVDisplay()
+
+        self._inputs = []
+        self._wait_count = 0
+        self._start = time.perf_counter()
+
+    def named_window(self, name):
+        self._display.named_window(name)
+
+    def show(self, name, image):
+        self._display.show(name, image)
+
+    def wait_key(self, delay):
+        key = self._display.wait_key(delay)
+
+        if key != -1:
+            self._record({"type": "key", "key": key})
+
+        self._wait_count += 1
+
+        return key
+
+    def set_mouse_callback(self, name, callback, param=None):
+        def recorded_callback(event, x, y, flags, callback_param):
+            self._record({"type": "mouse", "window": name, "event": event, "x": x, "y": y, "flags": flags})
+            callback(event, x, y, flags, callback_param)
+
+        self._display.set_mouse_callback(name, recorded_callback, param)
+
+    def destroy_window(self, name):
+        self._display.destroy_window(name)
+
+    def destroy_all_windows(self):
+        self._display.destroy_all_windows()
+
+    def close(self):
+        """
+        Write the script.
+        """
+
+        with open(self._path, "w") as outfile:
+            json.dump({"inputs": self._inputs}, outfile)
+
+        print("recorded {} inputs in {}".format(len(self._inputs), self._path))
+
+    def _record(self, entry):
+        """
+        Add an input to the script.
+
+        Arguments:
+            entry {dict} -- input
+        """
+
+        entry["wait"] = self._wait_count
+        entry["time"] = round(time.perf_counter() - self._start, 4)
+
+        self._inputs.append(entry)
+
+
+class ReplayDisplay(Display):
+    """
+    ReplayDisplay class, a headless display, which replays a script of the RecordingDisplay. It
+    measures the handling time of every key (until the loop waits for the next key) and the
+    input-to-frame latency (until the next frame is shown in the frame window) of every key press
+    and mouse event. Every wait_key call delivers at most one key, further keys of the same call
+    follow in the next calls. After the last input of the script it presses q to end the session.
+    """
+
+    def __init__(self, path, realtime=False, quit_key=113, frame_window="OpenCV Renderer"):
+        """
+        ReplayDisplay constructor.
+
+        Arguments:
+            path {string} -- path of the script
+
+        Keyword Arguments:
+            realtime {bool} -- wait like a real window, otherwise the loop runs as fast as possible (default: {False})
+            quit_key {int} -- key, which is pressed after the script (default: {113})
+            frame_window {string} -- window of the labelled frame, only its images end the input-to-frame latency (default: {"OpenCV Renderer"})
+        """
+
+        with open(path, "r") as read_file:
+            inputs = json.load(read_file)["inputs"]
+
+        self._inputs = sorted(inputs, key=lambda entry: entry["wait"])
+        self._next_input = 0
+        self._wait_count = 0
+
+        self._realtime = realtime
+        self._quit_key = quit_key
+        self._frame_window = frame_window
+
+        self._callbacks = {}
+        self._frames = {}
+        self._shown = 0
+
+        # (name, time of the input) of inputs, which wait for the next frame or the next wait_key
+        self._pending_latency = []
+        self._pending_handling = None
+
+        self._latencies = {}
+        self._handling_times = {}
+
+        self._start = time.perf_counter()
+        self._end = None
+
+    def named_window(self, name):
+        self._frames.setdefault(name, None)
+
+    def show(self, name, image):
+        now = time.perf_counter()
+
+        # other windows (e.g. the timeline) are drawn before the frame, they do not end the latency
+        if name == self._frame_window:
+            for input_name, input_time in self._pending_latency:
+                self._latencies.setdefault(input_name, []).append(now - input_time)
+
+            self._pending_latency = []
+
+        self._frames[name] = image
+        self._shown += 1
+
+    def wait_key(self, delay):
+        now = time.perf_counter()
+
+        if self._pending_handling is not None:
+            name, input_time = self._pending_handling
+            self._handling_times.setdefault(name, []).append(now - input_time)
+            self._pending_handling = None
+
+        key = -1
+
+        # inputs after a key wait for the next call, so that no key is lost
+        while key == -1 and self._next_input < len(self._inputs) and self._inputs[self._next_input]["wait"] <= self._wait_count:
+            entry = self._inputs[self._next_input]
+            self._next_input += 1
+
+            if entry["type"] == "mouse":
+                self._dispatch_mouse(entry)
+            else:
+                key = entry["key"]
+
+        if key == -1 and self._next_input >= len(self._inputs):
+            key = self._quit_key
+
+        self._wait_count += 1
+
+        if key != -1:
+            name = key_name(key)
+            input_time = time.perf_counter()
+
+            self._pending_latency.append((name, input_time))
+            self._pending_handling = (name, input_time)
+        elif self._realtime:
+            time.sleep(max(delay, 1) / 1000)
+
+        return key
+
+    def set_mouse_callback(self, name, callback, param=None):
+        self._callbacks[name] = (callback, param)
+
+    def destroy_window(self, name):
+        self._frames.pop(name, None)
+        self._callbacks.pop(name, None)
+
+    def destroy_all_windows(self):
+        self._frames.clear()
+        self._callbacks.clear()
+
+    def frame(self, name):
+        """
+        Get the last image, which was shown in a window.
+
+        Arguments:
+            name {string} -- window name
+
+        Returns:
+            opencv image -- image or None
+        """
+
+        return self._frames.get(name)
+
+    def close(self):
+        """
+        Print the report.
+        """
+
+        self._end = time.perf_counter()
+
+        report = self.report()
+
+        print("replayed {} inputs, {} frames shown in {:.2f}s".format(report["inputs"], report["frames_shown"], report["duration"]))
+
+        for name, stats in sorted(report["keys"].items()):
+            print("key {:>6}: {:4d}x handling {:.2f} ms (p95 {:.2f} ms), input to frame {:.2f} ms (p95 {:.2f} ms)".format(
+                name, stats["count"], stats["handling_mean_ms"], stats["handling_p95_ms"],
+                stats["latency_mean_ms"], stats["latency_p95_ms"]))
+
+        if "mouse" in report:
+            stats = report["mouse"]
+            print("mouse events: {:4d}x handling {:.2f} ms (p95 {:.2f} ms), input to frame {:.2f} ms (p95 {:.2f} ms)".format(
+                stats["count"], stats["handling_mean_ms"], stats["handling_p95_ms"],
+                stats["latency_mean_ms"], stats["latency_p95_ms"]))
+
+    def report(self):
+        """
+        Create the report of the replay.
+
+        Returns:
+            dict -- durations in ms per key and of the mouse events
+        """
+
+        def stats(times):
+            times = np.array(times or [0.0]) * 1000
+
+            return float(times.mean()), float(np.percentile(times, 50)), float(np.percentile(times, 95)), float(times.max())
+
+        report = {
+            "inputs": self._next_input,
+            "frames_shown": self._shown,
+            "duration": (self._end or time.perf_counter()) - self._start,
+            "keys": {},
+        }
+
+        for name, handling_times in self._handling_times.items():
+            entry = {"count": len(handling_times)}
+
+            for prefix, times in (("handling", handling_times), ("latency", self._latencies.get(name))):
+                mean, p50, p95, maximum = stats(times)
+                entry.update({prefix + "_mean_ms": mean, prefix + "_p50_ms": p50,
+                              prefix + "_p95_ms": p95, prefix + "_max_ms": maximum})
+
+            if name == "mouse":
+                report["mouse"] = entry
+            else:
+                report["keys"][name] = entry
+
+        return report
+
+    def _dispatch_mouse(self, entry):
+        """
+        Call the mouse callback of the window of a recorded mouse event.
+
+        Arguments:
+            entry {dict} -- recorded mouse event
+        """
+
+        callback = self._callbacks.get(entry["window"])
+
+        if callback is None:
+            return
+
+        # mouse events are drawn by their callback (e.g. while dragging a roi), events without
+        # drawing do not count for the latency
+        input_time = time.perf_counter()
+        pending = list(self._pending_latency)
+        self._pending_latency.append(("mouse", input_time))
+
+        function, param = callback
+        function(entry["event"], entry["x"], entry["y"], entry["flags"], param)
+
+        self._handling_times.setdefault("mouse", []).append(time.perf_counter() - input_time)
+
+        if ("mouse", input_time) in self._pending_latency:
+            self._pending_latency = pending
@@ -2,25 +2,39 @@
 LabelTool Module
 """
 import json
+import os
 import cv2 as cv
 import numpy as np
 
+from label_tool.display import OpenCVDisplay
 from label_tool.renderer import Renderer
 from label_tool.roi_creator import RoiCreator
-from util.tracker import RoiTracker
-from util.custom_encoder import CustomEncoder
+from label_tool.timeline import Timeline
+from label_tool.viewport import Viewport
+from util.tracker import AsyncRoiTracker
+from util.event_intervals import EventIntervals
+from util.label_index import LabelIndex
+from util.motion import load_motion_scores
+from util.classifier_worker import ClassifierWorker
+from util.frame_server import FrameClient
+from util.frame_source import open_frame_source, MAX_GRAB_GAP
+from util.history import EditHistory, freeze, thaw
+from util.multi_capture import MultiCapture
+from util.results_file import load_results, save_results, FRAME_SPACE, SOURCE_SPACE
+from util.shots import load_shot_boundaries, crosses_boundary, next_boundary, previous_boundary
 
 class LabelTool:
     """
     LabelTool class, which holds all functionality to label a given video with multiple rois.
     """
 
-    def __init__(self, video_path, config_path, output_path, prev_results=False, image_func=None, classify=False):
+    def __init__(self, video_path, config_path, output_path, prev_results=False, image_func=None, classify=False, motion=False, frame_server=None,
+                 frame_server_key=None, stride=1, fill_stride=False, zoom=False, cameras=None, display=None, shots=False):
         """
         LabelTool constructor.
 
         Arguments:
-            video_path {string} -- path to video file
+            video_path {string} -- path to video file, image directory or .npy file
             config_path {string} -- path to config file
             output_path {string} -- path to output file
 
@@ -28,51 +42,497 @@ class LabelTool:
             prev_results {bool} -- are previous results avaliable (with output_path as path) (default: {False})
             classify {bool} -- should classifier pre classify data (default: {False})
             image_func {python function} -- function that somehow converts the image (default: None)
+            motion {bool} -- should static frames be detected to skip them while labelling (default: {False})
+            frame_server {tuple} -- (host, port) of a local frame server, which decodes the frames instead of this instance (default: {None})
+            frame_server_key {string} -- key file of the frame server (default: {the default key file of its port})
+            stride {int} -- only every stride-th frame is shown and labelled (default: {1})
+            fill_stride {bool} -- should the skipped frames be filled from the labelled ones before saving (default: {False})
+            zoom {bool} -- show the frames in a zoomable view instead of converting them with image_func, rois are stored in source pixels (default: {False})
+            cameras {list} -- (path, time offset in seconds) of further synchronized cameras, which are labelled together with the video (default: {None})
+            display {Display} -- display backend, e.g. to record or replay a session (default: {OpenCVDisplay})
+            shots {bool} -- should shot boundaries be detected to reset the tracker and classify shot by shot (default: {False})
         """
 
         self._prev_results = prev_results
         self._output_path = output_path
 
         self._image_func = image_func
+        self._frame_server = frame_server
+        self._frame_server_key = frame_server_key
+        self._stride = max(stride, 1)
+        self._fill_stride = fill_stride
+        self._display = display or OpenCVDisplay()
 
-        self._load_video(video_path)
         self._load_config(config_path)
+
+        # the zoomable view replaces image_func, so frames are read in source resolution
+        if zoom:
+            self._image_func = None
+
+        # rois are stored in the pixels of the shown frames, which are only converted by image_func
+        self._roi_space = SOURCE_SPACE if self._image_func is None else FRAME_SPACE
+
+        self._load_video(video_path)
+
+        if zoom:
+            self._viewport = Viewport(self._video_width, self._video_height,
+                                      self._config.get("width", self._video_width), self._config.get("height", self._video_height))
+        else:
+            self._viewport = None
+
+        # further cameras are decoded in parallel and tiled with the video, which is the first camera
+        if cameras:
+            self._cameras = MultiCapture(self._video, list(cameras), self._config, self._image_func)
+        else:
+            self._cameras = None
+
+        # camera, whose rois are edited, and camera, whose rois are tracked
+        self._active_camera = 0
+        self._tracker_camera = 0
+
         self._load_results(output_path)
 
+        # index over the results and events to jump between labeled frames
+        self._label_index = LabelIndex(self._results, self._event_intervals)
+
+        # frame, which was marked as other end of an event range
+        self._event_mark = None
+
+        # undo/redo log of the edits
+        self._history = EditHistory(self._config.get("undo_memory", 16) * 1024 * 1024)
+
+        # first frames of all shots except the first one
+        self._shot_boundaries = []
+
+        if shots:
+            self._load_shots()
+
+        self._classifier_worker = None
+        self._classifier_error_reported = False
+
         if classify:
-            self._run_classifier()
+            self._start_classifier()
 
-    def _run_classifier(self):
+        # frames with motion, static frames are skipped if self._skip_static is set
+        self._motion_frames = None
+        self._skip_static = False
+
+        if motion:
+            self._load_motion()
+
+    def _load_shots(self):
         """
-        "Pre-classify" the given video by running the classifier and saving the results.
+        Load (or compute) the shot boundaries of the video with the shot threshold of the config.
         """
 
-        # only import if classification is needed
-        from util.classifier import Classifier
+        self._shot_boundaries = load_shot_boundaries(self._video_path, self._video_frame_count,
+                                                     self._config.get("shot_threshold", 0.4))
 
-        classifier = Classifier()
+        print("shots: {}".format(len(self._shot_boundaries) + 1))
 
-        frame_counter = 0
+    def _load_motion(self):
+        """
+        Load (or compute) the motion scores of the video and save the frames, whose score reaches
+        the motion threshold of the config.
+        """
 
-        # iterate over all frames
-        while self._video.isOpened():
-            # get current frame
-            ret, frame = self._video.read()
+        scores = load_motion_scores(self._video_path, self._video_frame_count)
+        threshold = self._config.get("motion_threshold", 1.0)
 
-            # check if frame was read successfully
-            if not ret:
-                break
+        self._motion_frames = np.flatnonzero(scores >= threshold)
+        self._skip_static = True
+
+        print("motion frames: {} of {}".format(len(self._motion_frames), self._video_frame_count))
+
+    def _next_motion(self, frame_counter):
+        """
+        Get the next frame with motion after the given frame.
+
+        Arguments:
+            frame_counter {int} -- current frame
+
+        Returns:
+            int -- frame index or None
+        """
+
+        if self._motion_frames is None:
+            return None
+
+        i = np.searchsorted(self._motion_frames, frame_counter, side="right")
+
+        if i < len(self._motion_frames):
+            return int(self._motion_frames[i])
+
+        return None
+
+    def _next_frame(self, frame_counter):
+        """
+        Get the frame after the given frame. Static frames are skipped if self._skip_static is set
+        and only every self._stride-th frame is used.
+
+        Arguments:
+            frame_counter {int} -- current frame
+
+        Returns:
+            int -- next frame, the given frame if only static frames follow
+        """
+
+        next_frame = frame_counter + 1
+
+        if self._skip_static:
+            next_motion = self._next_motion(frame_counter)
+
+            # stay at the last frame with motion instead of playing the static tail
+            if next_motion is None:
+                return frame_counter
+
+            next_frame = next_motion
+
+        # round up to the next multiple of the stride
+        return -(-next_frame // self._stride) * self._stride
+
+    def _previous_frame(self, frame_counter):
+        """
+        Get the frame before the given frame, only every self._stride-th frame is used.
+
+        Arguments:
+            frame_counter {int} -- current frame
+
+        Returns:
+            int -- previous frame
+        """
+
+        return max((frame_counter - 1) // self._stride * self._stride, 0)
+
+    def _fill_skipped_frames(self):
+        """
+        Fill the frames, which were skipped in strided mode, from the two surrounding labelled
+        frames: rois are interpolated linearly if both frames have the same number of rois,
+        otherwise the rois and the event of the nearer frame are used. Labeled frames are left
+        untouched. Across a shot boundary only the frame of the same shot is used. The frames after
+        the last labelled frame at the end of the video are filled from it alone.
+        """
+
+        filled = 0
+        last_frame = self._video_frame_count - 1
+
+        for start in range(0, last_frame, self._stride):
+            end = start + self._stride
+
+            # the last block of the video can be shorter than the stride and has no frame after it
+            one_sided = end > last_frame
+
+            if not self._label_index.is_labeled(start) and (one_sided or not self._label_index.is_labeled(end)):
+                continue
+
+            start_rois = self._results.get(start, {}).get("rois") or []
+            end_rois = self._results.get(end, {}).get("rois") or []
+
+            cut = crosses_boundary(self._shot_boundaries, start, end)
+
+            for frame_counter in range(start + 1, min(end, last_frame + 1)):
+                if self._label_index.is_labeled(frame_counter):
+                    continue
+
+                weight = (frame_counter - start) / self._stride
+                nearer = start if weight <= 0.5 else end
+
+                if one_sided:
+                    nearer = start
+                    rois = start_rois
+                elif cut:
+                    nearer = end if crosses_boundary(self._shot_boundaries, start, frame_counter) else start
+                    rois = self._results.get(nearer, {}).get("rois") or []
+                elif start_rois and len(start_rois) == len(end_rois):
+                    rois = (np.rint((1 - weight) * np.array(start_rois) + weight * np.array(end_rois))).astype(int).tolist()
+                else:
+                    rois = self._results.get(nearer, {}).get("rois") or []
+
+                event = self._event_intervals.get(nearer)
+
+                if rois:
+                    self._set_result(frame_counter, {"rois": rois})
+
+                if event is not None:
+                    self._event_intervals.set_range(frame_counter, frame_counter + 1, event)
+
+                if rois or event is not None:
+                    filled += 1
+
+        print("filled {} skipped frames".format(filled))
+
+    def _start_classifier(self):
+        """
+        "Pre-classify" the given video in the background, while the video is labelled. The results
+        are merged into self._results as they arrive (see self._merge_classifications).
+        """
+
+        self._classifier_worker = ClassifierWorker(self._video_path, self._video_frame_count, self._config,
+                                                   image_func=self._image_func, boundaries=self._shot_boundaries)
+
+    def _merge_classifications(self):
+        """
+        Merge the results of the background classification into self._results. Manual edits always
+        win: frames, which already have results or were edited by hand, are left untouched.
+        """
+
+        if self._classifier_worker is None:
+            return
+
+        for frame_counter, rois in self._classifier_worker.collect():
+            if frame_counter in self._results or frame_counter in self._edited_frames:
+                continue
+
+            if rois:
+                self._set_result(frame_counter, {"rois": rois})
+
+        if self._classifier_worker.error is not None and not self._classifier_error_reported:
+            print("classification failed: {!r}".format(self._classifier_worker.error))
+            self._classifier_error_reported = True
+
+    def _apply_tracked_rois(self, tracker):
+        """
+        Add the rois, which the tracker returned since the last call, to the results of their frames
+        and record them as one step in the edit history.
+
+        Arguments:
+            tracker {AsyncRoiTracker} -- tracker
+        """
+
+        deltas = []
+
+        for frame_counter, roi in tracker.collect():
+            entry = self._results.get(frame_counter, {})
+
+            # with multiple cameras the tracker runs on the tiled frame
+            if self._cameras:
+                roi = self._rois_to_source([roi], camera=self._tracker_camera)[0]
+
+            rois = self._camera_rois(entry, self._tracker_camera) + [roi]
+            entry = self._with_camera_rois(entry, self._tracker_camera, rois)
+
+            deltas.append(self._set_result(frame_counter, entry))
+            self._edited_frames.add(frame_counter)
+
+        self._history.record(deltas)
+
+    def _camera_rois(self, entry, camera):
+        """
+        Get the rois of a camera from a result entry. The rois of the first camera are stored in
+        "rois", the ones of further cameras in "camera_rois".
+
+        Arguments:
+            entry {dict} -- result entry
+            camera {int} -- index of the camera
+
+        Returns:
+            list -- rois of the camera
+        """
+
+        if camera == 0:
+            return list(entry.get("rois") or [])
+
+        camera_rois = entry.get("camera_rois") or []
+
+        if camera - 1 < len(camera_rois):
+            return list(camera_rois[camera - 1])
+
+        return []
+
+    def _with_camera_rois(self, entry, camera, rois):
+        """
+        Create a copy of a result entry with new rois of a camera.
+
+        Arguments:
+            entry {dict} -- result entry
+            camera {int} -- index of the camera
+            rois {list} -- new rois of the camera
+
+        Returns:
+            dict -- new result entry
+        """
+
+        entry = dict(entry)
+
+        if camera == 0:
+            entry["rois"] = rois
+        else:
+            camera_rois = [list(other_rois) for other_rois in entry.get("camera_rois") or []]
+            camera_rois += [[] for _ in range(camera - len(camera_rois))]
+            camera_rois[camera - 1] = rois
+
+            entry["camera_rois"] = camera_rois
+
+        return entry
+
+    def _rois_to_view(self, rois, camera=0):
+        """
+        Convert rois from the stored space into the space of the shown frame.
+
+        Arguments:
+            rois {list} -- stored rois
+
+        Keyword Arguments:
+            camera {int} -- index of the camera of the rois (default: {0})
+
+        Returns:
+            list -- rois in view space
+        """
+
+        if self._cameras:
+            x, y = self._cameras.origin(camera)
+            return [[roi[0] + x, roi[1] + y, roi[2], roi[3]] for roi in rois]
+
+        if not self._viewport:
+            return rois
+
+        return [self._viewport.to_view(roi) for roi in rois]
+
+    def _rois_to_source(self, rois, loaded_rois=None, camera=0):
+        """
+        Convert rois from the space of the shown frame into the stored space. Rois, which were
+        loaded and not changed, keep their exact stored coordinates, so that viewing a frame never
+        changes its rois by rounding.
 
-            # convert frame if self._image_func is set
-            if self._image_func:
-                frame = self._image_func(self._config, frame)
+        Arguments:
+            rois {list} -- rois in view space
+
+        Keyword Arguments:
+            loaded_rois {list} -- stored rois, which were loaded into the shown frame (default: {None})
+            camera {int} -- index of the camera of the rois (default: {0})
+
+        Returns:
+            list -- stored rois
+        """
+
+        if self._cameras:
+            x, y = self._cameras.origin(camera)
+            return [[roi[0] - x, roi[1] - y, roi[2], roi[3]] for roi in rois]
+
+        if not self._viewport:
+            return rois
+
+        unchanged = {tuple(self._viewport.to_view(roi)): roi for roi in loaded_rois or []}
+
+        return [unchanged.get(tuple(roi)) or self._viewport.to_source(roi) for roi in rois]
+
+    def _draw_cameras(self, image, entry):
+        """
+        Draw the rois of the inactive cameras and a border around the active camera.
+
+        Arguments:
+            image {opencv image} -- tiled frame
+            entry {dict} -- result entry of the frame
+        """
+
+        for camera in range(self._cameras.camera_count):
+            if camera == self._active_camera:
+                continue
+
+            for roi in self._rois_to_view(self._camera_rois(entry, camera), camera):
+                cv.rectangle(image, (roi[0], roi[1]), (roi[0] + roi[2], roi[1] + roi[3]), (200, 200, 200), 1)
+
+        x, y = self._cameras.origin(self._active_camera)
+        width, height = self._cameras.tile_size
+
+        cv.rectangle(image, (x, y), (x + width - 1, y + height - 1), (0, 255, 0), 1)
+
+    def _set_result(self, frame_counter, entry):
+        """
+        Set the result of a frame and keep the label index up to date.
+
+        Arguments:
+            frame_counter {int} -- frame index
+            entry {dict} -- result entry or None to remove the result
+
+        Returns:
+            tuple -- (frame, before, after) with frozen states for the edit history
+        """
+
+        before = freeze(self._results.get(frame_counter))
+
+        if entry is None:
+            self._results.pop(frame_counter, None)
+        else:
+            self._results[frame_counter] = entry
+
+        self._label_index.update(frame_counter, entry)
+
+        return (frame_counter, before, freeze(entry))
+
+    def _set_events(self, start, end, event):
+        """
+        Set the event of all frames in [start, end), event None clears the range.
+
+        Arguments:
+            start {int} -- first frame
+            end {int} -- frame after the last frame
+            event {string} -- event or None
 
-            rois = classifier.detect(frame)
+        Returns:
+            tuple -- (("events", start, end), before, after) with the spans of the range for the edit history
+        """
+
+        before = tuple(self._event_intervals.set_range(start, end, event))
+        after = ((start, end, event),) if event is not None else ()
+
+        return (("events", start, end), before, after)
+
+    def _mark_event_range(self, frame_counter, event):
+        """
+        Set the event of all frames between the event mark and the current frame (both included).
+
+        Arguments:
+            frame_counter {int} -- current frame
+            event {string} -- event or None to clear the range
+        """
+
+        if self._event_mark is None:
+            print("no event mark set, mark a frame with b first")
+            return
 
-            # save results
-            self._results[frame_counter] = {"rois": rois, "event": None}
+        start = min(self._event_mark, frame_counter)
+        end = max(self._event_mark, frame_counter) + 1
+
+        self._history.record([self._set_events(start, end, event)])
+
+        print("event of frames {} to {}: {}".format(start, end - 1, event))
+
+    def _undo_redo(self, frame_counter, undo):
+        """
+        Undo or redo the last step of the edit history.
+
+        Arguments:
+            frame_counter {int} -- current frame
+            undo {bool} -- undo if True, redo otherwise
+
+        Returns:
+            int -- frame of the restored edit or the current frame, if there was nothing to restore
+        """
 
-            frame_counter += 1
+        action = "undo" if undo else "redo"
+        changes = self._history.undo() if undo else self._history.redo()
+
+        if changes is None:
+            print("nothing to {}".format(action))
+            return frame_counter
+
+        for key, state in changes:
+            if isinstance(key, tuple):
+                # event range: restore the spans of the range
+                _, start, end = key
+                self._event_intervals.clear_range(start, end)
+
+                for span in state:
+                    self._event_intervals.set_range(*span)
+            else:
+                self._set_result(key, thaw(state))
+
+        print("{}: {} change(s)".format(action, len(changes)))
+
+        key = changes[0][0]
+
+        return key[1] if isinstance(key, tuple) else key
 
     def _load_config(self, path):
         """
@@ -90,7 +550,8 @@ class LabelTool:
 
     def _load_results(self, path):
         """
-        Load previous results
+        Load previous results. Results, whose rois are in another space than the one of this
+        session, are refused.
 
         Arguments:
             path {string} -- path to previous results
@@ -100,31 +561,39 @@ class LabelTool:
         if self._prev_results:
             # try to open the file -> catch json errors
             try:
-                # load results and convert all keys to int
-                with open(path, "r") as read_file:
-                    tmp_results = json.load(read_file)
-
-                results = {}
-
-                for key, value in tmp_results.items():
-                    results[int(key)] = value
+                # load results with int keys, the event intervals, the frames edited by hand and the space of the rois
+                results, events, edited, roi_space = load_results(path)
 
             except json.JSONDecodeError as exception:
                 print(
                     "could not load json results. json exception: {}".format(exception))
                 exit(1)
 
+            except ValueError as exception:
+                print("could not load results: {}".format(exception))
+                exit(1)
+
+            # e.g. rois of the zoomable view are in source pixels, the ones of the resized view are not
+            if roi_space is not None and roi_space != self._roi_space:
+                print("the rois in {} are stored in {} pixels, but this session labels in {} pixels (see --zoom)".format(
+                    path, roi_space, self._roi_space))
+                exit(1)
+
             print("loaded previous results")
         else:
-            # no previous results avaliable -> save empty dict
-            results = {}
+            # no previous results avaliable -> save empty dict and intervals
+            results, events, edited = {}, EventIntervals(), set()
 
         self._results = results
+        self._event_intervals = events
+
+        # frames, whose rois were edited by hand, are never overwritten by the classification
+        self._edited_frames = edited
 
     def _load_video(self, path):
         """
-        Load the input video from path with the help of OpenCV.
-        Compute the general metrics for the video and save them:
+        Open the frame source of the input video, image directory or .npy stack or connect to the
+        frame server. Compute the general metrics for the video and save them:
         - fps
         - frame count
         - duration
@@ -132,27 +601,61 @@ class LabelTool:
         - height
 
         Arguments:
-            path {string} -- path to video
+            path {string} -- path to video, image directory or .npy file
         """
-        self._video = cv.VideoCapture(path)
-        self._video_fps = self._video.get(cv.CAP_PROP_FPS)
-        self._video_frame_count = int(self._video.get(cv.CAP_PROP_FRAME_COUNT))
+        # without trailing separator, so that caches of image directories are stored next to them
+        self._video_path = os.path.normpath(path)
+
+        if self._frame_server:
+            # the server identifies videos by path, so use the same path for all annotators
+            self._video = FrameClient(os.path.abspath(path), self._config, self._image_func, self._frame_server,
+                                      self._frame_server_key)
+        else:
+            # skip small gaps (e.g. of the stride) with grab(), which does not decode the frames
+            self._video = open_frame_source(self._video_path, self._config.get("fps"), max(MAX_GRAB_GAP, self._stride))
+
+        self._video_fps = self._video.fps
+        self._video_frame_count = self._video.frame_count
+        self._video_width = self._video.width
+        self._video_height = self._video.height
+
         self._video_duration = self._video_frame_count/self._video_fps
-        self._video_width = int(self._video.get(cv.CAP_PROP_FRAME_WIDTH))
-        self._video_height = int(self._video.get(cv.CAP_PROP_FRAME_HEIGHT))
 
         print("video path: {} \nframes: {} \nfps: {} \nduration: {}s".format(path, self._video_frame_count, round(self._video_fps, 2), round(self._video_duration, 2)))
 
+    def _read_frame(self, frame_counter):
+        """
+        Read the frame with the given index and convert it if self._image_func is set. Frames of
+        the frame server are already converted.
+
+        Arguments:
+            frame_counter {int} -- frame index
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        if self._cameras:
+            return self._cameras.read(frame_counter)
+
+        ret, frame = self._video.read(frame_counter)
+
+        # convert frame if self._image_func is set
+        if ret and self._image_func and not self._frame_server:
+            frame = self._image_func(self._config, frame)
+
+        return ret, frame
+
     def _saveResults(self, results):
         """
-        Save given results to output path.
+        Save given results and the event intervals to output path.
 
         Arguments:
             results {dict} -- results of the labelling
         """
 
-        with open(self._output_path, "w") as outfile:
-            json.dump(results, outfile, cls=CustomEncoder)
+        save_results(self._output_path, results, self._event_intervals, self._config.get("event_intervals", False),
+                     self._edited_frames, self._roi_space)
 
         print("saved results in {} at current directory".format(self._output_path))
 
@@ -183,53 +686,162 @@ class LabelTool:
         cv.putText(image, text, (text_offset_x, text_offset_y),
                    font, 1, (0, 255, 0), 2, cv.LINE_AA)
 
+    def _change_viewport(self, key):
+        """
+        Zoom or pan the view.
+
+        Arguments:
+            key {int} -- key code of pressed key
+        """
+
+        if key in [43, 61]:
+            # key: + or =
+            self._viewport.zoom_in()
+        elif key == 45:
+            # key: -
+            self._viewport.zoom_out()
+        elif key == 82:
+            # key: R
+            self._viewport.reset()
+        elif key == 87:
+            # key: W
+            self._viewport.pan(0, -0.25)
+        elif key == 65:
+            # key: A
+            self._viewport.pan(-0.25, 0)
+        elif key == 83:
+            # key: S
+            self._viewport.pan(0, 0.25)
+        elif key == 68:
+            # key: D
+            self._viewport.pan(0.25, 0)
+
+        print("zoom: {}, visible region: {}".format(self._viewport.zoom, [int(v) for v in self._viewport.region()]))
+
+    def _jump(self, frame_counter, find_frame, description):
+        """
+        Jump to the frame found by find_frame, if there is one inside of the video.
+
+        Arguments:
+            frame_counter {int} -- current frame
+            find_frame {python function} -- function, which returns the target frame for the current frame or None
+            description {string} -- description of the target frame
+
+        Returns:
+            int -- new frame counter
+        """
+
+        target = find_frame(frame_counter)
+
+        if target is None or target >= self._video_frame_count:
+            print("no {} found".format(description))
+            return frame_counter
+
+        print("jumped to {}: {}".format(description, target))
+
+        return target
+
     def run(self):
         """
         Run LabelTool.
         """
 
         # create renderer
-        renderer = Renderer(self._video_fps)
+        renderer = Renderer(self._video_fps, self._display)
 
-        # create tracker
-        tracker = RoiTracker()
+        # create timeline, a click on it wakes up the renderer to seek immediately
+        timeline = Timeline(self._video_path, self._video_frame_count, self._config.get("width", self._video_width),
+                            self._events, on_seek=lambda frame: renderer.wake_up(), display=self._display)
+
+        # create tracker, which runs in its own thread
+        tracker = AsyncRoiTracker(self._config.get("tracker_backlog", 8), self._config.get("tracker_skip_policy", "drop"))
 
         # initialize frame counter
         frame_counter = 0
 
+        # last unannotated frame, to not decode it again if the frame does not change (e.g. on zoom)
+        last_frame = None
+
         # iterate over all frames
-        while self._video.isOpened():
+        while True:
             # get current frame
-            ret, frame = self._video.read()
+            if last_frame is not None and last_frame[0] == frame_counter:
+                ret, frame = True, last_frame[1]
+            else:
+                ret, frame = self._read_frame(frame_counter)
 
             # check if frame was read successfully
             if not ret:
                 break
 
-            # convert frame if self._image_func is set
-            if self._image_func:
-                frame = self._image_func(self._config, frame)
+            # keep the unannotated frame for the tracker and let it track in the background
+            if self._viewport:
+                raw_frame = frame
+                frame = self._viewport.render(raw_frame, frame_counter)
+            else:
+                raw_frame = frame
+                frame = frame.copy()
+
+            # the tracked object is gone after a cut, keep what was tracked before the cut
+            if tracker.initialized and last_frame is not None and \
+                    crosses_boundary(self._shot_boundaries, last_frame[0], frame_counter):
+                tracker.wait_idle()
+                tracker.destroy_tracker()
+                self._apply_tracked_rois(tracker)
+                print("tracker reset at shot boundary")
+
+            last_frame = (frame_counter, raw_frame)
 
-            # create roi creator for each frame
-            roi_creator = RoiCreator(self._video_width, self._video_height, renderer.window_name)
+            if tracker.initialized:
+                tracker.submit(frame_counter, raw_frame)
+
+            # merge results of the background classification and let it continue from here
+            if self._classifier_worker:
+                self._classifier_worker.seek(frame_counter)
+                self._merge_classifications()
+
+            # create roi creator for each frame, with multiple cameras only on the tile of the active camera
+            if self._cameras:
+                roi_creator = RoiCreator(*self._cameras.tile_size, renderer.window_name,
+                                         origin=self._cameras.origin(self._active_camera), display=self._display)
+            elif self._viewport:
+                roi_creator = RoiCreator(frame.shape[1], frame.shape[0], renderer.window_name, display=self._display)
+            else:
+                roi_creator = RoiCreator(self._video_width, self._video_height, renderer.window_name, display=self._display)
 
             rois = []
 
             # check if there are prev. results in self._results for current frame
             if frame_counter in self._results:
-                event = self._results[frame_counter].get("event", None)
-                rois += self._results[frame_counter].get("rois", None)
-            else:
-                event = None
+                rois += self._camera_rois(self._results[frame_counter], self._active_camera)
+
+            event = self._event_intervals.get(frame_counter)
 
             print("current frame: {}, rois: {}, event: {}, playback speed: {} ms per frame".format(frame_counter, rois, event, renderer.current_speed))
 
             # check if there are some rois
+            loaded_rois = rois
+
             if rois:
-                roi_creator.load_rois(rois, frame)
+                roi_creator.load_rois(self._rois_to_view(rois, self._active_camera), frame)
+
+            # write current event and classification state in frame
+            text = "event: {}".format(event)
 
-            # write current event in frame
-            self._write_text(frame, "event: {}".format(event))
+            if self._classifier_worker and self._classifier_worker.error is not None:
+                text += " (classification failed)"
+            elif self._classifier_worker:
+                classified, frame_count = self._classifier_worker.progress
+                state = "classified" if self._classifier_worker.is_classified(frame_counter) else "not classified"
+                text += " ({}, {}/{})".format(state, classified, frame_count)
+
+            if tracker.initialized:
+                text += " tracker backlog: {}, skipped: {}".format(tracker.backlog, tracker.skipped)
+
+            self._write_text(frame, text)
+
+            if self._cameras:
+                self._draw_cameras(frame, self._results.get(frame_counter, {}))
 
             # check mode of rendering and either create mousecallback for roi creation or draw found rois in frame
             if renderer.frame_by_frame:
@@ -237,14 +849,14 @@ class LabelTool:
             else:
                 frame = roi_creator.draw_rois(frame)
 
-            # render current frame
+            # render current frame and position in timeline
+            timeline.show(frame_counter, self._label_index)
             renderer.current_frame = frame
             key = renderer.show_frame()
 
             # check, which action has to be performed
             if key == 99:
                 # key: c
-                self._video.set(cv.CAP_PROP_POS_FRAMES, 1)
                 print("jumped to start of video")
                 frame_counter = 0
             elif key == 113:
@@ -266,57 +878,160 @@ class LabelTool:
                 else:
                     event = self._events[tmpIndex]
             elif key == 48:
-                # key: v
+                # key: 0
                 event = None
+            elif key == 98:
+                # key: b
+                self._event_mark = frame_counter
+                print("event mark set: {}".format(frame_counter))
+            elif key == 103:
+                # key: g
+                self._mark_event_range(frame_counter, event)
+            elif key == 102:
+                # key: f
+                self._mark_event_range(frame_counter, None)
+                event = self._event_intervals.get(frame_counter)
             elif key == 120:
                 # key: x
                 roi_creator.remove_current_roi()
+            elif key == 119:
+                # key: w
+                if self._motion_frames is None:
+                    print("motion scores not loaded, start with --motion")
+                else:
+                    self._skip_static ^= True
+                    print("skip static frames: {}".format(self._skip_static))
             elif key == 112:
                 # key: p
                 if not tracker.initialized:
-                    tracker.init_tracker(frame, roi_creator.get_current_roi())
+                    # the tracker runs on the unannotated frame: the source frame in the zoomable view, the tiled frame with multiple cameras
+                    tracker_roi = roi_creator.get_current_roi()
+
+                    if not self._cameras:
+                        tracker_roi = self._rois_to_source([tracker_roi])[0]
+
+                    self._tracker_camera = self._active_camera
+                    tracker.init_tracker(frame_counter, raw_frame, tracker_roi)
                 else:
                     tracker.destroy_tracker()
 
-            # check if there are results
-            if tracker.initialized:
-                tracked_roi = tracker.track(frame)
-                roi_creator.add_roi(tracked_roi, frame, color=(255, 255, 255))
-
             # get rois of roi_creator
-            rois = roi_creator.get_rois()
+            rois = self._rois_to_source(roi_creator.get_rois(), loaded_rois, self._active_camera)
 
-            # save results for current frame
-            if frame_counter in self._results:
-                self._results[frame_counter] = {"rois": rois, "event": event}
-            else:
-                if rois or event is not None:
-                    self._results[frame_counter] = {
-                        "rois": rois, "event": event}
+            # also deleting all rois is an edit, which the classification must not undo
+            if rois != loaded_rois:
+                self._edited_frames.add(frame_counter)
+
+            # save results for current frame and record the edit, the event only if it was changed
+            deltas = []
+
+            if frame_counter in self._results or rois:
+                entry = self._with_camera_rois(self._results.get(frame_counter, {}), self._active_camera, rois)
+
+                if not entry.get("rois") and not any(entry.get("camera_rois") or []):
+                    entry = None
+
+                deltas.append(self._set_result(frame_counter, entry))
+
+            if event != self._event_intervals.get(frame_counter):
+                deltas.append(self._set_events(frame_counter, frame_counter + 1, event))
+
+            self._history.record(deltas)
+
+            # change the view only after the rois were saved with the region they were drawn in
+            if key in [43, 61, 45, 82, 87, 65, 83, 68] and self._viewport:
+                self._change_viewport(key)
+
+            # switch the camera only after the rois of the active camera were saved
+            if key == 9 and self._cameras:
+                # key: TAB
+                self._active_camera = (self._active_camera + 1) % self._cameras.camera_count
+                print("active camera: {}".format(self._active_camera))
+
+            # add rois, which were tracked in the meantime
+            self._apply_tracked_rois(tracker)
 
             # check which frame is next
             if key == 255 and not renderer.frame_by_frame:
                 # key: NO KEY
-                frame_counter += 1
+                frame_counter = self._next_frame(frame_counter)
             elif key == 110:
                 # key: n
                 if renderer.frame_by_frame and frame_counter > 0:
-                    frame_counter -= 1
+                    frame_counter = self._previous_frame(frame_counter)
             elif key == 109:
                 # key: m
                 if renderer.frame_by_frame and frame_counter < self._video_frame_count:
-                    frame_counter += 1
+                    frame_counter = self._next_frame(frame_counter)
+            elif key == 106:
+                # key: j
+                frame_counter = self._jump(frame_counter, self._label_index.previous_labeled, "previous labeled frame")
+            elif key == 107:
+                # key: k
+                frame_counter = self._jump(frame_counter, self._label_index.next_labeled, "next labeled frame")
+            elif key == 104:
+                # key: h
+                frame_counter = self._jump(frame_counter, self._label_index.previous_event_change, "previous event change")
+            elif key == 108:
+                # key: l
+                frame_counter = self._jump(frame_counter, self._label_index.next_event_change, "next event change")
+            elif key == 117:
+                # key: u
+                frame_counter = self._jump(frame_counter, self._label_index.previous_gap, "previous unlabeled gap")
+            elif key == 105:
+                # key: i
+                frame_counter = self._jump(frame_counter, self._label_index.next_gap, "next unlabeled gap")
+            elif key == 101:
+                # key: e
+                frame_counter = self._jump(frame_counter, self._next_motion, "next motion frame")
+            elif key == 91:
+                # key: [
+                frame_counter = self._jump(frame_counter, lambda frame: previous_boundary(self._shot_boundaries, frame),
+                                           "previous shot boundary")
+            elif key == 93:
+                # key: ]
+                frame_counter = self._jump(frame_counter, lambda frame: next_boundary(self._shot_boundaries, frame),
+                                           "next shot boundary")
+            elif key == 122:
+                # key: z
+                frame_counter = self._undo_redo(frame_counter, undo=True)
+            elif key == 121:
+                # key: y
+                frame_counter = self._undo_redo(frame_counter, undo=False)
+
+            # check if a position in the timeline was clicked
+            seek = timeline.pop_seek()
+            if seek is not None:
+                frame_counter = seek
 
             # remove mousecallback if it was set for current frame
             if renderer.frame_by_frame:
                 roi_creator.remove_mouse_callback()
 
-            # set next frame
-            self._video.set(cv.CAP_PROP_POS_FRAMES, frame_counter)
+        # stop tracker and keep what was tracked so far
+        tracker.stop()
+        self._apply_tracked_rois(tracker)
+
+        # stop background classification and keep what was classified so far
+        if self._classifier_worker:
+            self._classifier_worker.stop()
+            self._merge_classifications()
+
+        # destroy video, timeline and opencv objects
+        timeline.stop()
+
+        if self._cameras:
+            self._cameras.release()
 
-        # destroy video and opencv objects
         self._video.release()
-        cv.destroyAllWindows()
+        self._display.destroy_all_windows()
+
+        # fill frames, which were skipped in strided mode
+        if self._stride > 1 and self._fill_stride:
+            self._fill_skipped_frames()
 
         # finally save results
         self._saveResults(self._results)
+
+        # e.g. write the recorded session or report the replay
+        self._display.close()
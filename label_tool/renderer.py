@@ -1,7 +1,7 @@
 """
 Renderer Module
 """
-import cv2 as cv
+from label_tool.display import OpenCVDisplay
 
 class Renderer:
     """
@@ -9,21 +9,30 @@ class Renderer:
     regarding speed and pause/play.
     """
 
-    def __init__(self, fps):
+    def __init__(self, fps, display=None):
         """
         Renderer Class constructor.
 
         Arguments:
             fps {int} -- fps of current video
+
+        Keyword Arguments:
+            display {Display} -- display backend (default: {OpenCVDisplay})
         """
 
+        self._display = display or OpenCVDisplay()
+
         self._current_frame = None
         self._window_name = "OpenCV Renderer"
         self._frame_by_frame = True
         self._current_speed = int((1 / int(fps)) * 1000)
 
+        # while paused, wait for keys in short intervals to be able to react on wake ups
+        self._poll_interval = 50
+        self._woken_up = False
+
         # already create named frame for the mousecallbacks
-        cv.namedWindow(self._window_name)
+        self._display.named_window(self._window_name)
 
 
     def show_frame(self):
@@ -41,13 +50,28 @@ class Renderer:
             raise ValueError("current frame is none")
 
         if self._frame_by_frame:
-            key = cv.waitKey(0)
+            self._woken_up = False
+            key = -1
+
+            while key == -1 and not self._woken_up:
+                key = self._display.wait_key(self._poll_interval)
+
+            if key == -1:
+                # key: NO KEY
+                key = 255
         else:
-            cv.imshow(self._window_name, self._current_frame)
-            key = cv.waitKey(self._current_speed) & 0xFF
+            self._display.show(self._window_name, self._current_frame)
+            key = self._display.wait_key(self._current_speed) & 0xFF
 
         return key
 
+    def wake_up(self):
+        """
+        Return from show_frame without a key press, e.g. after a click in another window.
+        """
+
+        self._woken_up = True
+
     def pause_play(self):
         """
         Pause or play the video.
@@ -4,6 +4,8 @@ RoiCreator Module
 import cv2 as cv
 import numpy as np
 
+from label_tool.display import OpenCVDisplay
+
 class Rect:
     """
     Rect class.
@@ -82,10 +84,14 @@ class DragRect:
 
 
 class RoiCreator:
-    def __init__(self, width, height, window_name):
+    def __init__(self, width, height, window_name, origin=(0, 0), display=None):
         self._width = width
         self._height = height
         self._window_name = window_name
+        self._display = display or OpenCVDisplay()
+
+        # top left corner of the canvas in the frame, e.g. of a tile of a tiled frame
+        self._origin = origin
 
         self._rois = []
 
@@ -96,14 +102,14 @@ class RoiCreator:
         self._results_loaded = False
 
     def set_mouse_callback(self, frame):
-        cv.setMouseCallback(self._window_name, self._drag_roi, frame)
+        self._display.set_mouse_callback(self._window_name, self._drag_roi, frame)
         if  self._results_loaded:
                self._draw(self._current_roi)
         else:
-            cv.imshow(self._window_name, frame)
+            self._display.show(self._window_name, frame)
 
     def remove_mouse_callback(self):
-        cv.setMouseCallback(self._window_name, lambda *args : None)
+        self._display.set_mouse_callback(self._window_name, lambda *args : None)
 
     def get_current_roi(self):
         return self._current_roi.current_rect.to_array()
@@ -181,8 +187,8 @@ class RoiCreator:
 
     def _init_roi(self):
         # Limit the selection box to the canvas
-        self._current_roi.canvas_boundaries.x = 0
-        self._current_roi.canvas_boundaries.y = 0
+        self._current_roi.canvas_boundaries.x = self._origin[0]
+        self._current_roi.canvas_boundaries.y = self._origin[1]
         self._current_roi.canvas_boundaries.w = self._width
         self._current_roi.canvas_boundaries.h = self._height
 
@@ -420,7 +426,7 @@ class RoiCreator:
 
                 cv.rectangle(tmp, (r.current_rect.x, r.current_rect.y), (r.current_rect.x + r.current_rect.w,r.current_rect.y + r.current_rect.h), color, 2)
 
-        cv.imshow(self._window_name, tmp)
+        self._display.show(self._window_name, tmp)
 
     def _disable_resize_buttons(self, drag_obj):
         drag_obj.TL = drag_obj.TM = drag_obj.TR = False
@@ -0,0 +1,240 @@
+"""
+Timeline Module
+"""
+import os
+import threading
+import cv2 as cv
+import numpy as np
+
+from label_tool.display import OpenCVDisplay
+from util.frame_source import open_frame_source
+
+# colors of the event spans (BGR), indexed by the position of the event in the config
+EVENT_COLORS = [(0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 255, 255), (255, 0, 255),
+                (255, 255, 0), (0, 128, 255), (128, 0, 255), (255, 128, 0)]
+
+
+def _lower_thread_priority():
+    """
+    Lower the scheduling priority of the calling thread. On Linux the native thread id can be
+    used as process id for setpriority, on other platforms this is a no-op.
+    """
+
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+class Timeline:
+    """
+    Timeline class, which shows a strip of thumbnails of the whole video with the labeled frames,
+    event spans and the current position below the rendered frames. A click on the strip requests
+    a seek to the clicked position.
+    """
+
+    def __init__(self, video_path, frame_count, width, events, on_seek=None, thumb_height=40, marker_height=12, display=None):
+        """
+        Timeline constructor.
+
+        Arguments:
+            video_path {string} -- path to video file
+            frame_count {int} -- number of frames of the video
+            width {int} -- width of the strip in pixel
+            events {list} -- events of the config
+
+        Keyword Arguments:
+            on_seek {python function} -- called with the frame index after a click on the strip (default: {None})
+            thumb_height {int} -- height of the thumbnails in pixel (default: {40})
+            marker_height {int} -- height of the marker bar below the thumbnails in pixel (default: {12})
+            display {Display} -- display backend (default: {OpenCVDisplay})
+        """
+
+        self._video_path = video_path
+        self._frame_count = max(frame_count, 1)
+        self._width = width
+        self._events = events
+        self._on_seek = on_seek
+        self._thumb_height = thumb_height
+        self._marker_height = marker_height
+        self._display = display or OpenCVDisplay()
+
+        self._window_name = "OpenCV Timeline"
+
+        with open_frame_source(video_path) as source:
+            video_width = source.width or 1
+            video_height = source.height or 1
+
+        # thumbnails keep the aspect ratio of the video and fill the whole width of the strip
+        self._thumb_width = max(int(thumb_height * video_width / video_height), 1)
+        self._thumb_count = max(width // self._thumb_width, 1)
+        self._stride = max(-(-self._frame_count // self._thumb_count), 1)
+
+        self._thumbnails = np.zeros((thumb_height, self._thumb_count * self._thumb_width, 3), np.uint8)
+        self._thumbnails_done = 0
+
+        self._markers = None
+        self._markers_version = None
+
+        self._seek_request = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._generate_thumbnails, daemon=True)
+
+        self._display.named_window(self._window_name)
+        self._display.set_mouse_callback(self._window_name, self._click)
+
+        self._thread.start()
+
+    @property
+    def cache_path(self):
+        """
+        Thumbnail cache path getter.
+
+        Returns:
+            string -- path of the thumbnail cache next to the video
+        """
+
+        return "{}.thumbs_{}x{}.npy".format(self._video_path, self._thumb_count, self._thumb_height)
+
+    def _load_cache(self):
+        """
+        Load the thumbnails from disk, if the cache is newer than the video.
+
+        Returns:
+            bool -- True if the thumbnails were loaded
+        """
+
+        path = self.cache_path
+
+        if not os.path.isfile(path) or os.path.getmtime(path) < os.path.getmtime(self._video_path):
+            return False
+
+        try:
+            thumbnails = np.load(path)
+        except (OSError, ValueError):
+            return False
+
+        if thumbnails.shape != self._thumbnails.shape:
+            return False
+
+        self._thumbnails = thumbnails
+        self._thumbnails_done = self._thumb_count
+
+        return True
+
+    def _generate_thumbnails(self):
+        """
+        Generate the thumbnails in the background. Only every stride-th frame is decoded, video
+        sources skip all other frames with grab().
+        """
+
+        if self._load_cache():
+            return
+
+        _lower_thread_priority()
+
+        with open_frame_source(self._video_path) as source:
+            for _, frame in source.iterate(0, self._thumb_count * self._stride, self._stride):
+                if self._stop.is_set():
+                    break
+
+                thumbnail = cv.resize(frame, (self._thumb_width, self._thumb_height), interpolation=cv.INTER_AREA)
+
+                start = self._thumbnails_done * self._thumb_width
+                self._thumbnails[:, start:start + self._thumb_width] = thumbnail
+                self._thumbnails_done += 1
+
+        if self._thumbnails_done == self._thumb_count:
+            np.save(self.cache_path, self._thumbnails)
+
+    def _render_markers(self, label_index):
+        """
+        Render the labeled frames and event spans into the marker bar.
+
+        Arguments:
+            label_index {LabelIndex} -- index over the results
+
+        Returns:
+            numpy array -- marker bar image
+        """
+
+        if self._markers is not None and self._markers_version == label_index.version:
+            return self._markers
+
+        markers = np.full((self._marker_height, self._thumbnails.shape[1], 3), 40, np.uint8)
+        scale = markers.shape[1] / self._frame_count
+
+        # event spans in the upper part of the bar, at least one pixel wide
+        for start, end, event in label_index.events.spans():
+            if event not in self._events:
+                continue
+
+            x0 = int(start * scale)
+            x1 = max(int(end * scale), x0 + 1)
+
+            markers[:self._marker_height // 2, x0:x1] = EVENT_COLORS[self._events.index(event) % len(EVENT_COLORS)]
+
+        # frames with rois in the lower part of the bar
+        frames = np.array(label_index.roi_frames, dtype=np.int64)
+
+        if frames.size:
+            markers[self._marker_height // 2:, (frames * scale).astype(np.int64)] = (255, 255, 255)
+
+        self._markers = markers
+        self._markers_version = label_index.version
+
+        return markers
+
+    def show(self, frame_counter, label_index):
+        """
+        Show the timeline with the current position.
+
+        Arguments:
+            frame_counter {int} -- current frame
+            label_index {LabelIndex} -- index over the results
+        """
+
+        image = np.vstack((self._thumbnails, self._render_markers(label_index)))
+
+        position = int(frame_counter * image.shape[1] / self._frame_count)
+        cv.line(image, (position, 0), (position, image.shape[0] - 1), (0, 0, 255), 2)
+
+        self._display.show(self._window_name, image)
+
+    def pop_seek(self):
+        """
+        Get and reset the frame requested by the last click on the strip.
+
+        Returns:
+            int -- requested frame or None
+        """
+
+        seek_request = self._seek_request
+        self._seek_request = None
+
+        return seek_request
+
+    def stop(self):
+        """
+        Stop the thumbnail generation and close the timeline.
+        """
+
+        self._stop.set()
+        self._thread.join()
+
+        self._display.destroy_window(self._window_name)
+
+    def _click(self, event, x, y, flags, param):
+        """
+        Mouse callback of the timeline window.
+        """
+
+        if event != cv.EVENT_LBUTTONDOWN:
+            return
+
+        frame = int(x * self._frame_count / self._thumbnails.shape[1])
+        self._seek_request = min(max(frame, 0), self._frame_count - 1)
+
+        if self._on_seek:
+            self._on_seek(self._seek_request)
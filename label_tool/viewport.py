@@ -0,0 +1,190 @@
+"""
+Viewport Module
+"""
+from collections import OrderedDict
+import cv2 as cv
+
+
+class Viewport:
+    """
+    Viewport class, which shows a zoomable and pannable part of high resolution frames in a view
+    of fixed size. Without zoom a downsampled overview is shown, which is cached per frame. With
+    zoom only the visible region of the source frame is cropped and scaled. Rois are converted
+    between view space and source pixel space.
+    """
+
+    def __init__(self, source_width, source_height, view_width, view_height, max_zoom=32, overview_cache_size=16):
+        """
+        Viewport constructor.
+
+        Arguments:
+            source_width {int} -- width of the source frames
+            source_height {int} -- height of the source frames
+            view_width {int} -- width of the view
+            view_height {int} -- height of the view
+
+        Keyword Arguments:
+            max_zoom {int} -- maximum zoom factor (default: {32})
+            overview_cache_size {int} -- number of cached overviews (default: {16})
+        """
+
+        self._source_width = source_width
+        self._source_height = source_height
+        self._view_width = view_width
+        self._view_height = view_height
+        self._max_zoom = max_zoom
+
+        self._zoom = 1
+        self._center_x = source_width / 2
+        self._center_y = source_height / 2
+
+        self._overviews = OrderedDict()
+        self._overview_cache_size = overview_cache_size
+
+    @property
+    def zoom(self):
+        """
+        Zoom getter.
+
+        Returns:
+            int -- current zoom factor
+        """
+
+        return self._zoom
+
+    def region(self):
+        """
+        Get the visible region of the source frame.
+
+        Returns:
+            tuple -- (x, y, w, h) in source pixel space
+        """
+
+        width = self._source_width / self._zoom
+        height = self._source_height / self._zoom
+
+        x = min(max(self._center_x - width / 2, 0), self._source_width - width)
+        y = min(max(self._center_y - height / 2, 0), self._source_height - height)
+
+        return x, y, width, height
+
+    def zoom_in(self):
+        """
+        Double the zoom factor until max_zoom.
+        """
+
+        self._zoom = min(self._zoom * 2, self._max_zoom)
+
+    def zoom_out(self):
+        """
+        Halve the zoom factor until the whole frame is visible.
+        """
+
+        self._zoom = max(self._zoom // 2, 1)
+
+    def reset(self):
+        """
+        Show the whole frame.
+        """
+
+        self._zoom = 1
+        self._center_x = self._source_width / 2
+        self._center_y = self._source_height / 2
+
+    def pan(self, dx, dy):
+        """
+        Move the visible region.
+
+        Arguments:
+            dx {float} -- horizontal movement in widths of the visible region
+            dy {float} -- vertical movement in heights of the visible region
+        """
+
+        # start from the clamped region, so that panning back from an edge reacts immediately
+        x, y, width, height = self.region()
+
+        self._center_x = min(max(x + width / 2 + dx * width, width / 2), self._source_width - width / 2)
+        self._center_y = min(max(y + height / 2 + dy * height, height / 2), self._source_height - height / 2)
+
+    def render(self, frame, frame_counter=None):
+        """
+        Render the visible region of the source frame into an image of the view size.
+
+        Arguments:
+            frame {opencv image} -- source frame
+
+        Keyword Arguments:
+            frame_counter {int} -- index of the frame, used to cache the overview (default: {None})
+
+        Returns:
+            opencv image -- view image
+        """
+
+        view_size = (self._view_width, self._view_height)
+
+        if self._zoom == 1:
+            overview = self._overviews.get(frame_counter) if frame_counter is not None else None
+
+            if overview is None:
+                overview = cv.resize(frame, view_size, interpolation=cv.INTER_AREA)
+
+                if frame_counter is not None:
+                    self._overviews[frame_counter] = overview
+
+                    while len(self._overviews) > self._overview_cache_size:
+                        self._overviews.popitem(last=False)
+            else:
+                self._overviews.move_to_end(frame_counter)
+
+            return overview.copy()
+
+        x, y, width, height = self.region()
+
+        x0, y0 = int(x), int(y)
+        x1 = min(int(round(x + width)), self._source_width)
+        y1 = min(int(round(y + height)), self._source_height)
+
+        detail = frame[y0:y1, x0:x1]
+
+        if detail.shape[1] > self._view_width:
+            interpolation = cv.INTER_AREA
+        else:
+            interpolation = cv.INTER_LINEAR
+
+        return cv.resize(detail, view_size, interpolation=interpolation)
+
+    def to_view(self, roi):
+        """
+        Convert a roi from source pixel space into view space.
+
+        Arguments:
+            roi {list} -- [x, y, w, h] in source pixel space
+
+        Returns:
+            list -- [x, y, w, h] in view space
+        """
+
+        x, y, width, height = self.region()
+        scale_x = self._view_width / width
+        scale_y = self._view_height / height
+
+        return [int(round((roi[0] - x) * scale_x)), int(round((roi[1] - y) * scale_y)),
+                int(round(roi[2] * scale_x)), int(round(roi[3] * scale_y))]
+
+    def to_source(self, roi):
+        """
+        Convert a roi from view space into source pixel space.
+
+        Arguments:
+            roi {list} -- [x, y, w, h] in view space
+
+        Returns:
+            list -- [x, y, w, h] in source pixel space
+        """
+
+        x, y, width, height = self.region()
+        scale_x = width / self._view_width
+        scale_y = height / self._view_height
+
+        return [int(round(x + roi[0] * scale_x)), int(round(y + roi[1] * scale_y)),
+                int(round(roi[2] * scale_x)), int(round(roi[3] * scale_y))]
@@ -1,21 +1,48 @@
 import argparse
+import json
 import os
 
+from label_tool.display import OpenCVDisplay, RecordingDisplay, ReplayDisplay
 from label_tool.label_tool import LabelTool
 from util.transform_image import resize_image
 
 def check_file(path):
     return os.path.isfile(path)
 
+def check_source(path):
+    return os.path.isfile(path) or os.path.isdir(path)
+
 def main():
 
-    parser = argparse.ArgumentParser(description='label a given video. if video is paused, use mouse to draw rois\n\ncontrols of the editor:\na: slower replay\ns: faster replay\nq: EXIT\nSPACE: pause or start\nn: (if pause) go to previous frame\nm: (if pause) go to next frame\n1: go to first frame\nc: car_in event\nv: car_out event\nd: delete event\nx: delete roi', formatter_class=argparse.RawTextHelpFormatter)
+    parser = argparse.ArgumentParser(description='label a given video. if video is paused, use mouse to draw rois\n\ncontrols of the editor:\na: slower replay\ns: faster replay\nq: EXIT\nSPACE: pause or start\nn: (if pause) go to previous frame\nm: (if pause) go to next frame\n1: go to first frame\nc: car_in event\nv: car_out event\nd: delete event\nx: delete roi\nj/k: go to previous/next labeled frame\nh/l: go to previous/next event change\nu/i: go to previous/next unlabeled gap\nw: (with --motion) skip static frames on/off\ne: (with --motion) go to next frame with motion\n[/]: (with --shots) go to previous/next shot boundary\nz: undo\ny: redo\n+/-: (with --zoom) zoom in/out\nW/A/S/D: (with --zoom) pan view\nR: (with --zoom) reset view\nb: mark frame as other end of an event range\ng: set current event from mark to current frame\nf: clear events from mark to current frame\nTAB: (with --camera) switch camera, whose rois are edited', formatter_class=argparse.RawTextHelpFormatter)
 
-    parser.add_argument('path', type=str, help='path to video file')
+    parser.add_argument('path', type=str, help='path to video file, directory of images or .npy stack of frames')
     parser.add_argument('config', type=str, help="path to config json")
     parser.add_argument('-o', '--output', type=str, default="labels.json",
                         help='output json file name. default: ./labels.json')
     parser.add_argument('-c', '--classify', action="store_true", default=False)
+    parser.add_argument('-m', '--motion', action="store_true", default=False,
+                        help='compute motion scores and skip static frames (threshold: "motion_threshold" in config)')
+    parser.add_argument('--shots', action="store_true", default=False,
+                        help='detect shot boundaries, reset the tracker at cuts and navigate cuts with [/] (threshold: "shot_threshold" in config)')
+    parser.add_argument('--stride', type=int, default=1,
+                        help='only show and label every k-th frame, skipped frames are not decoded. default: 1')
+    parser.add_argument('--fill-stride', action="store_true", default=False,
+                        help='fill the skipped frames of --stride from the labelled ones before saving')
+    parser.add_argument('--zoom', action="store_true", default=False,
+                        help='zoomable view for high resolution videos, rois are stored in source pixels')
+    parser.add_argument('--camera', type=str, action="append", default=[],
+                        help='further synchronized camera PATH[@OFFSET], OFFSET is its time offset in seconds. can be used multiple times')
+    parser.add_argument('--frame-server', type=str, default=None,
+                        help='read frames from a local frame server at host:port (start it with: python -m util.frame_server)')
+    parser.add_argument('--frame-server-key', type=str, default=None,
+                        help='(with --frame-server) key file of the frame server. default: ~/.label_tool/frame_server_PORT.key')
+    parser.add_argument('--record', type=str, default=None,
+                        help='record all key presses and mouse events of the session into a script')
+    parser.add_argument('--replay', type=str, default=None,
+                        help='replay a recorded script without windows and report the input latencies')
+    parser.add_argument('--report', type=str, default=None,
+                        help='(with --replay) write the latency report as json to this file')
 
     args = parser.parse_args()
 
@@ -23,9 +50,15 @@ def main():
     output_path = args.output
     config_path = args.config
     classify = args.classify
+    motion = args.motion
+
+    frame_server = None
+    if args.frame_server:
+        host, port = args.frame_server.rsplit(":", 1)
+        frame_server = (host, int(port))
 
     # check if config and video exist
-    if not check_file(path):
+    if not check_source(path):
         print("input video does not exist")
         exit(1)
 
@@ -33,11 +66,46 @@ def main():
         print("config file does not exist")
         exit(1)
 
+    cameras = []
+    for camera in args.camera:
+        camera_path, _, offset = camera.partition("@")
+
+        if not check_source(camera_path):
+            print("camera video {} does not exist".format(camera_path))
+            exit(1)
+
+        cameras.append((camera_path, float(offset or 0)))
+
+    if cameras and (args.zoom or frame_server):
+        print("multiple cameras can not be combined with --zoom or --frame-server")
+        exit(1)
+
+    if args.record and args.replay:
+        print("--record can not be combined with --replay")
+        exit(1)
+
+    if args.replay:
+        if not check_file(args.replay):
+            print("replay script does not exist")
+            exit(1)
+
+        display = ReplayDisplay(args.replay)
+    elif args.record:
+        display = RecordingDisplay(args.record)
+    else:
+        display = OpenCVDisplay()
+
     label_tool = LabelTool(path, config_path, output_path, prev_results=check_file(
-        output_path), image_func=resize_image, classify=classify)
+        output_path), image_func=resize_image, classify=classify, motion=motion, frame_server=frame_server,
+        frame_server_key=args.frame_server_key, stride=args.stride, fill_stride=args.fill_stride, zoom=args.zoom, cameras=cameras, display=display,
+        shots=args.shots)
 
     label_tool.run()
 
+    if args.replay and args.report:
+        with open(args.report, "w") as outfile:
+            json.dump(display.report(), outfile, indent=4)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,287 @@
+"""
+ClassifierCache Module
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+from util.transform_image import transform_config
+
+# number of frames, which are stored together in one cache file
+CHUNK_SIZE = 256
+
+# number of blocks, which are sampled from the video file for the fingerprint
+FINGERPRINT_BLOCKS = 16
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+
+def default_cache_dir():
+    """
+    Get the default directory of the classifier cache.
+
+    Returns:
+        string -- path to cache directory
+    """
+
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+
+    return os.path.join(base, "label_tool", "classifier")
+
+
+def video_fingerprint(path):
+    """
+    Compute a fast fingerprint of a video file from its size and evenly sampled blocks, so that
+    large videos do not have to be read completely. Image directories are fingerprinted by the
+    names, sizes and modification times of their files.
+
+    Arguments:
+        path {string} -- path to video file, image directory or .npy file
+
+    Returns:
+        string -- hex digest
+    """
+
+    if os.path.isdir(path):
+        digest = hashlib.blake2b(digest_size=16)
+
+        for entry in sorted(os.scandir(path), key=lambda entry: entry.name):
+            if entry.is_file():
+                stat = entry.stat()
+                digest.update("{}:{}:{}\n".format(entry.name, stat.st_size, stat.st_mtime_ns).encode())
+
+        return digest.hexdigest()
+
+    size = os.path.getsize(path)
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+
+    with open(path, "rb") as video_file:
+        for offset in np.linspace(0, max(size - FINGERPRINT_BLOCK_SIZE, 0), FINGERPRINT_BLOCKS).astype(np.int64):
+            video_file.seek(int(offset))
+            digest.update(video_file.read(FINGERPRINT_BLOCK_SIZE))
+
+    return digest.hexdigest()
+
+
+class _Chunk:
+    """
+    Detections of CHUNK_SIZE consecutive frames.
+    """
+
+    def __init__(self):
+        """
+        _Chunk constructor.
+        """
+
+        self.classified = np.zeros(CHUNK_SIZE, dtype=bool)
+        self.rois = [[] for _ in range(CHUNK_SIZE)]
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a chunk from its compact binary form.
+
+        Arguments:
+            path {string} -- path to chunk file
+
+        Returns:
+            _Chunk -- loaded chunk
+        """
+
+        chunk = cls()
+
+        with np.load(path) as data:
+            chunk.classified = np.unpackbits(data["classified"])[:CHUNK_SIZE].astype(bool)
+            offsets = data["offsets"]
+            boxes = data["boxes"]
+
+        for i in range(CHUNK_SIZE):
+            chunk.rois[i] = boxes[offsets[i]:offsets[i + 1]].tolist()
+
+        return chunk
+
+    def save(self, path):
+        """
+        Save the chunk in a compact binary form: a bit mask of the classified frames, offsets
+        into a single array of boxes and the boxes themselves.
+
+        Arguments:
+            path {string} -- path to chunk file
+        """
+
+        counts = [len(rois) for rois in self.rois]
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int32)
+
+        boxes = [box for rois in self.rois for box in rois]
+        boxes = np.asarray(boxes) if boxes else np.zeros((0, 4), np.int32)
+
+        if np.issubdtype(boxes.dtype, np.integer):
+            boxes = boxes.astype(np.int32)
+
+        # write to a temporary file first, so that readers never see half written chunks
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "wb") as chunk_file:
+            np.savez(chunk_file, classified=np.packbits(self.classified), offsets=offsets, boxes=boxes)
+
+        os.replace(tmp_path, path)
+
+        self.dirty = False
+
+
+class ClassifierCache:
+    """
+    ClassifierCache class, which stores the detections of a classifier per frame on disk. The
+    cache is addressed by a fingerprint of the video, the version of the classifier, the image
+    function and the part of the config, which it reads, so that any change of those invalidates
+    the cached results, but other settings do not.
+    """
+
+    def __init__(self, video_path, classifier_version, config, image_func=None, cache_dir=None, max_size=512 * 1024 * 1024):
+        """
+        ClassifierCache constructor.
+
+        Arguments:
+            video_path {string} -- path to video file
+            classifier_version {string} -- version of the classifier
+            config {dict} -- config, which is passed to image_func
+
+        Keyword Arguments:
+            image_func {python function} -- function that somehow converts the image (default: None)
+            cache_dir {string} -- directory of the cache (default: {default_cache_dir()})
+            max_size {int} -- maximum size of the whole cache in bytes (default: {512 MiB})
+        """
+
+        self._cache_dir = cache_dir or default_cache_dir()
+        self._max_size = max_size
+
+        if image_func:
+            image_func_name = "{}.{}".format(image_func.__module__, image_func.__qualname__)
+        else:
+            image_func_name = None
+
+        key = hashlib.blake2b(digest_size=16)
+        key.update(video_fingerprint(video_path).encode())
+        key.update(str(classifier_version).encode())
+        key.update(json.dumps([image_func_name, transform_config(config)], sort_keys=True).encode())
+
+        self._dir = os.path.join(self._cache_dir, key.hexdigest())
+        os.makedirs(self._dir, exist_ok=True)
+
+        self._chunks = {}
+
+    def _chunk_path(self, chunk_index):
+        """
+        Get the path of a chunk file.
+
+        Arguments:
+            chunk_index {int} -- index of the chunk
+
+        Returns:
+            string -- path to chunk file
+        """
+
+        return os.path.join(self._dir, "{}.npz".format(chunk_index))
+
+    def _chunk(self, chunk_index):
+        """
+        Get a chunk, load it from disk if it is not in memory yet.
+
+        Arguments:
+            chunk_index {int} -- index of the chunk
+
+        Returns:
+            _Chunk -- chunk
+        """
+
+        chunk = self._chunks.get(chunk_index)
+
+        if chunk is None:
+            path = self._chunk_path(chunk_index)
+
+            try:
+                chunk = _Chunk.load(path)
+
+                # update the modification time to evict least recently used chunks first
+                os.utime(path)
+            except (OSError, ValueError, KeyError):
+                chunk = _Chunk()
+
+            self._chunks[chunk_index] = chunk
+
+        return chunk
+
+    def lookup(self, frame):
+        """
+        Look up the detections of a frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            tuple -- (hit, rois), rois is None on a miss
+        """
+
+        chunk = self._chunk(frame // CHUNK_SIZE)
+
+        if chunk.classified[frame % CHUNK_SIZE]:
+            return True, chunk.rois[frame % CHUNK_SIZE]
+
+        return False, None
+
+    def store(self, frame, rois):
+        """
+        Store the detections of a frame. They are written to disk with flush.
+
+        Arguments:
+            frame {int} -- frame index
+            rois {list} -- detected rois
+        """
+
+        chunk = self._chunk(frame // CHUNK_SIZE)
+        chunk.classified[frame % CHUNK_SIZE] = True
+        chunk.rois[frame % CHUNK_SIZE] = [list(roi) for roi in rois]
+        chunk.dirty = True
+
+    def flush(self):
+        """
+        Write all changed chunks to disk and evict old chunks, if the cache is too large.
+        """
+
+        for chunk_index, chunk in self._chunks.items():
+            if chunk.dirty:
+                chunk.save(self._chunk_path(chunk_index))
+
+        self._evict()
+
+    def _evict(self):
+        """
+        Remove the least recently used chunk files of all videos, until the cache fits into max_size.
+        """
+
+        files = []
+
+        for root, _, names in os.walk(self._cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in files)
+
+        for _, size, path in sorted(files):
+            if total_size <= self._max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            total_size -= size
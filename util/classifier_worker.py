@@ -0,0 +1,237 @@
+"""
+ClassifierWorker Module
+"""
+import queue
+import threading
+import numpy as np
+
+from util.classifier_cache import ClassifierCache, CHUNK_SIZE
+from util.frame_source import open_frame_source
+from util.shots import shot_range
+
+
+class ClassifierWorker:
+    """
+    ClassifierWorker class, which "pre-classifies" a video in a background thread with its own
+    frame source. Frames are classified in order from the current playhead and the results can be
+    collected while the video is labelled. With shot boundaries the shot of the playhead is
+    completed first, before the classification continues with the following shots.
+    """
+
+    def __init__(self, video_path, frame_count, config, image_func=None, start_frame=0, cache=True, cache_dir=None, open_source=open_frame_source,
+                 boundaries=None):
+        """
+        ClassifierWorker constructor.
+
+        Arguments:
+            video_path {string} -- path to video file, image directory or .npy file
+            frame_count {int} -- number of frames of the video
+            config {dict} -- config, which is passed to image_func
+
+        Keyword Arguments:
+            image_func {python function} -- function that somehow converts the image (default: None)
+            open_source {python function} -- function, which opens the FrameSource of the worker (default: {open_frame_source})
+            boundaries {list} -- sorted shot boundaries (default: {None})
+            start_frame {int} -- frame, where the classification starts (default: {0})
+            cache {bool} -- should results be cached on disk and reused (default: {True})
+            cache_dir {string} -- directory of the cache (default: {None})
+        """
+
+        self._video_path = video_path
+        self._open_source = open_source
+        self._config = config
+        self._image_func = image_func
+
+        self._use_cache = cache
+        self._cache_dir = cache_dir
+        self._cache_size = config.get("classifier_cache_size", 512) * 1024 * 1024
+
+        self._classified = np.zeros(frame_count, dtype=bool)
+        self._boundaries = list(boundaries or [])
+        self._cursor = start_frame
+        self._playhead = None
+
+        self._results = queue.Queue()
+
+        # exception, which ended the classification early
+        self._error = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def seek(self, frame):
+        """
+        Continue the classification at the first unclassified frame from frame on.
+
+        Arguments:
+            frame {int} -- current playhead
+        """
+
+        self._playhead = frame
+
+    def is_classified(self, frame):
+        """
+        Check if the given frame was already classified.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            bool -- True if the frame was classified
+        """
+
+        return 0 <= frame < len(self._classified) and bool(self._classified[frame])
+
+    @property
+    def error(self):
+        """
+        Error getter.
+
+        Returns:
+            Exception -- exception, which stopped the classification (e.g. the classifier could not be imported), or None
+        """
+
+        return self._error
+
+    @property
+    def progress(self):
+        """
+        Progress getter.
+
+        Returns:
+            tuple -- (number of classified frames, number of frames)
+        """
+
+        return int(np.count_nonzero(self._classified)), len(self._classified)
+
+    def collect(self):
+        """
+        Get all results, which arrived since the last call.
+
+        Returns:
+            list -- list of (frame index, rois) tuples
+        """
+
+        results = []
+
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def stop(self):
+        """
+        Stop the classification.
+        """
+
+        self._stop.set()
+        self._thread.join()
+
+    def _next_frame(self):
+        """
+        Get the next unclassified frame from the cursor on: first until the end of the shot of the
+        cursor, then from the start of this shot, then the rest of the video, wrapping around at
+        its end.
+
+        Returns:
+            int -- frame index or None if all frames are classified
+        """
+
+        playhead = self._playhead
+
+        if playhead is not None:
+            self._playhead = None
+            self._cursor = playhead
+
+        cursor = self._cursor
+        shot_start, shot_stop = shot_range(self._boundaries, cursor, len(self._classified))
+
+        for start, stop in ((cursor, shot_stop), (shot_start, cursor), (cursor, None), (0, None)):
+            unclassified = np.flatnonzero(~self._classified[start:stop])
+
+            if unclassified.size:
+                return start + int(unclassified[0])
+
+        return None
+
+    def _run(self):
+        """
+        Run the classification and keep an exception for the main thread, instead of ending the
+        thread silently.
+        """
+
+        try:
+            self._classify()
+        except Exception as exception:
+            self._error = exception
+
+    def _classify(self):
+        """
+        Classify frames until all frames are classified or the worker is stopped.
+        """
+
+        # only import if classification is needed
+        from label_tool.classifier import Classifier
+
+        # the classifier itself is only created on the first cache miss
+        classifier = None
+
+        if self._use_cache:
+            cache = ClassifierCache(self._video_path, getattr(Classifier, "version", "0"), self._config,
+                                    image_func=self._image_func, cache_dir=self._cache_dir, max_size=self._cache_size)
+        else:
+            cache = None
+
+        source = self._open_source(self._video_path)
+        last_chunk = None
+
+        while not self._stop.is_set():
+            frame_counter = self._next_frame()
+
+            if frame_counter is None:
+                break
+
+            self._cursor = frame_counter + 1
+
+            if cache:
+                # write finished chunks to disk, so that an interrupted session can be resumed
+                if last_chunk is not None and frame_counter // CHUNK_SIZE != last_chunk:
+                    cache.flush()
+
+                last_chunk = frame_counter // CHUNK_SIZE
+
+                hit, rois = cache.lookup(frame_counter)
+
+                if hit:
+                    self._results.put((frame_counter, rois))
+                    self._classified[frame_counter] = True
+                    continue
+
+            ret, frame = source.read(frame_counter)
+
+            # convert and classify frame if it was read successfully
+            if ret:
+                if self._image_func:
+                    frame = self._image_func(self._config, frame)
+
+                if classifier is None:
+                    classifier = Classifier()
+
+                detections = classifier.detect(frame)
+
+                # e.g. NumPy arrays of the classifier become lists of ints, like the cache hits
+                rois = [[int(value) for value in roi] for roi in (detections if detections is not None else [])]
+
+                if cache:
+                    cache.store(frame_counter, rois)
+
+                self._results.put((frame_counter, rois))
+
+            self._classified[frame_counter] = True
+
+        source.release()
+
+        if cache:
+            cache.flush()
@@ -0,0 +1,291 @@
+"""
+EventIntervals Module
+"""
+from bisect import bisect_left, bisect_right
+
+
+class EventIntervals:
+    """
+    EventIntervals class, which stores the events of a video run-length encoded as sorted,
+    non-overlapping spans [start, end). Adjacent spans with the same event are always merged, so
+    every start and end of a span is a frame, where the event changes.
+    """
+
+    def __init__(self, spans=None):
+        """
+        EventIntervals constructor.
+
+        Keyword Arguments:
+            spans {list} -- list of [start, end, event] spans (default: {None})
+        """
+
+        self._starts = []
+        self._ends = []
+        self._events = []
+
+        # incremented on every change, so that views can cache what they derive from the events
+        self._version = 0
+
+        for start, end, event in sorted(spans or []):
+            self.set_range(start, end, event)
+
+    @classmethod
+    def from_frames(cls, frame_events):
+        """
+        Create the intervals from per frame events.
+
+        Arguments:
+            frame_events {dict} -- event per frame index
+
+        Returns:
+            EventIntervals -- intervals
+        """
+
+        spans = []
+
+        for frame in sorted(frame_events):
+            event = frame_events[frame]
+
+            if event is None:
+                continue
+
+            if spans and spans[-1][1] == frame and spans[-1][2] == event:
+                spans[-1][1] = frame + 1
+            else:
+                spans.append([frame, frame + 1, event])
+
+        return cls(spans)
+
+    def to_list(self):
+        """
+        Get the compact serializable form of the intervals.
+
+        Returns:
+            list -- list of [start, end, event] spans
+        """
+
+        return [[start, end, event] for start, end, event in zip(self._starts, self._ends, self._events)]
+
+    @property
+    def version(self):
+        """
+        Version getter.
+
+        Returns:
+            int -- number of changes of the intervals
+        """
+
+        return self._version
+
+    def get(self, frame):
+        """
+        Get the event of a frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            string -- event or None
+        """
+
+        span = self.span_at(frame)
+
+        return span[2] if span else None
+
+    def span_at(self, frame):
+        """
+        Get the span containing a frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            tuple -- (start, end, event) or None
+        """
+
+        i = bisect_right(self._starts, frame) - 1
+
+        if i >= 0 and frame < self._ends[i]:
+            return self._starts[i], self._ends[i], self._events[i]
+
+        return None
+
+    def spans(self, start=None, end=None):
+        """
+        Get the spans overlapping [start, end), clipped to the range.
+
+        Keyword Arguments:
+            start {int} -- first frame (default: {None})
+            end {int} -- frame after the last frame (default: {None})
+
+        Returns:
+            list -- list of (start, end, event) tuples
+        """
+
+        if start is None and end is None:
+            return list(zip(self._starts, self._ends, self._events))
+
+        i = bisect_right(self._ends, start)
+        j = bisect_left(self._starts, end)
+
+        return [(max(self._starts[k], start), min(self._ends[k], end), self._events[k]) for k in range(i, j)]
+
+    def set_range(self, start, end, event):
+        """
+        Set the event of all frames in [start, end). Event None clears the range.
+
+        Arguments:
+            start {int} -- first frame
+            end {int} -- frame after the last frame
+            event {string} -- event or None
+
+        Returns:
+            list -- the spans of the range before the change, clipped to the range
+        """
+
+        if end <= start:
+            return []
+
+        i = bisect_right(self._ends, start)
+        j = bisect_left(self._starts, end)
+
+        previous = [(max(self._starts[k], start), min(self._ends[k], end), self._events[k]) for k in range(i, j)]
+
+        if previous == ([(start, end, event)] if event is not None else []):
+            return previous
+
+        spans = []
+
+        # keep the parts of the overlapping spans outside of the range
+        if i < j and self._starts[i] < start:
+            spans.append((self._starts[i], start, self._events[i]))
+
+        if event is not None:
+            spans.append((start, end, event))
+
+        if i < j and self._ends[j - 1] > end:
+            spans.append((end, self._ends[j - 1], self._events[j - 1]))
+
+        self._starts[i:j] = [span[0] for span in spans]
+        self._ends[i:j] = [span[1] for span in spans]
+        self._events[i:j] = [span[2] for span in spans]
+
+        self._merge(max(i - 1, 0), i + len(spans))
+
+        self._version += 1
+
+        return previous
+
+    def clear_range(self, start, end):
+        """
+        Clear the events of all frames in [start, end).
+
+        Arguments:
+            start {int} -- first frame
+            end {int} -- frame after the last frame
+
+        Returns:
+            list -- the spans of the range before the change, clipped to the range
+        """
+
+        return self.set_range(start, end, None)
+
+    def next_start(self, frame):
+        """
+        Get the first frame after the given frame, where a span starts.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        i = bisect_right(self._starts, frame)
+
+        return self._starts[i] if i < len(self._starts) else None
+
+    def previous_end(self, frame):
+        """
+        Get the last frame before the given frame, which is the last frame of a span.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        i = bisect_left(self._ends, frame + 1)
+
+        return self._ends[i - 1] - 1 if i > 0 else None
+
+    def next_change(self, frame):
+        """
+        Get the first frame after the given frame, whose event differs from the event of its
+        predecessor.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        candidates = []
+
+        for boundaries in (self._starts, self._ends):
+            i = bisect_right(boundaries, frame)
+
+            if i < len(boundaries):
+                candidates.append(boundaries[i])
+
+        return min(candidates) if candidates else None
+
+    def previous_change(self, frame):
+        """
+        Get the last frame before the given frame, whose event differs from the event of its
+        predecessor. The first frame counts as change.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        if frame <= 0:
+            return None
+
+        candidates = [0]
+
+        for boundaries in (self._starts, self._ends):
+            i = bisect_left(boundaries, frame)
+
+            if i > 0:
+                candidates.append(boundaries[i - 1])
+
+        return max(candidates)
+
+    def _merge(self, first, last):
+        """
+        Merge adjacent spans with the same event between the indices first and last.
+
+        Arguments:
+            first {int} -- index of the first span to check
+            last {int} -- index of the last span to check
+        """
+
+        k = first
+
+        while k < min(last, len(self._starts) - 1):
+            if self._ends[k] == self._starts[k + 1] and self._events[k] == self._events[k + 1]:
+                self._ends[k] = self._ends[k + 1]
+
+                del self._starts[k + 1]
+                del self._ends[k + 1]
+                del self._events[k + 1]
+
+                last -= 1
+            else:
+                k += 1
@@ -0,0 +1,466 @@
+"""
+FrameServer Module
+
+A local frame server, which owns the decoders of the videos and a shared cache of transformed
+frames, so that several annotators working on the same video on one host decode every frame
+only once. Clients connect over a loopback socket.
+
+The server creates a random key at startup and writes it into a file, which only its user can
+read. Clients read the key from there, so only processes of this user can connect. The frames
+are transformed with functions of an allow-list, which clients select by name.
+
+Start it with:
+    python -m util.frame_server --port 6010
+"""
+import argparse
+import ipaddress
+import json
+import os
+import socket
+import threading
+from collections import OrderedDict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, answer_challenge, deliver_challenge
+
+from util.frame_source import FrameSource, open_frame_source
+from util.transform_image import resize_image, transform_config
+
+DEFAULT_ADDRESS = ("127.0.0.1", 6010)
+
+# functions, which the server applies to the frames, selected by name
+TRANSFORMS = {"resize_image": resize_image}
+
+
+def authkey_path(port):
+    """
+    Get the path of the key file of the server on a port.
+
+    Arguments:
+        port {int} -- port of the server
+
+    Returns:
+        string -- path in the home directory of the user
+    """
+
+    return os.path.join(os.path.expanduser("~"), ".label_tool", "frame_server_{}.key".format(port))
+
+
+def _write_authkey(path, authkey):
+    """
+    Write the key into a file, which only the user can read.
+
+    Arguments:
+        path {string} -- path of the key file
+        authkey {bytes} -- key
+    """
+
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+    # an existing file may have been created with other permissions, so it is replaced
+    if os.path.exists(path):
+        os.remove(path)
+
+    with os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as key_file:
+        key_file.write(authkey)
+
+
+def read_authkey(path):
+    """
+    Read the key of a server.
+
+    Arguments:
+        path {string} -- path of the key file
+
+    Returns:
+        bytes -- key
+    """
+
+    with open(path, "rb") as key_file:
+        return key_file.read()
+
+
+def transform_name(image_func):
+    """
+    Get the name, by which the server knows a function.
+
+    Arguments:
+        image_func {python function} -- function that somehow converts the image or None
+
+    Raises:
+        ValueError: the function is not in TRANSFORMS.
+
+    Returns:
+        string -- name or None
+    """
+
+    if image_func is None:
+        return None
+
+    for name, transform in TRANSFORMS.items():
+        if transform is image_func:
+            return name
+
+    raise ValueError("the frame server can not apply {}, only: {}".format(
+        getattr(image_func, "__name__", image_func), ", ".join(sorted(TRANSFORMS))))
+
+
+def _transform_key(config, transform):
+    """
+    Create a hashable key of the transformation, which is applied to the frames. Only the part of
+    the config, which the transform reads, is used, so that annotators with otherwise different
+    configs share the cached frames.
+
+    Arguments:
+        config {dict} -- config, which is passed to the transform
+        transform {string} -- name of the transform
+
+    Returns:
+        tuple -- key of the transformation
+    """
+
+    if transform is None:
+        return None
+
+    return (transform, json.dumps(transform_config(config), sort_keys=True))
+
+
+class _Decoder:
+    """
+    Frame source of a single video, which is shared by the client threads.
+    """
+
+    def __init__(self, path):
+        """
+        _Decoder constructor.
+
+        Arguments:
+            path {string} -- path to video file, image directory or .npy file
+        """
+
+        self.source = open_frame_source(path)
+        self.lock = threading.Lock()
+
+        self.info = {
+            "frame_count": self.source.frame_count,
+            "fps": self.source.fps,
+            "width": self.source.width,
+            "height": self.source.height,
+        }
+
+    def read(self, index):
+        """
+        Read the frame with the given index.
+
+        Arguments:
+            index {int} -- frame index
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        with self.lock:
+            return self.source.read(index)
+
+
+class FrameServer:
+    """
+    FrameServer class, which serves transformed frames by index to FrameClients.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, cache_size=1024, key_path=None):
+        """
+        FrameServer constructor.
+
+        Keyword Arguments:
+            address {tuple} -- (host, port) to listen on, host has to be a loopback address (default: {DEFAULT_ADDRESS})
+            cache_size {int} -- size of the shared frame cache in MB (default: {1024})
+            key_path {string} -- file, into which the random key of the server is written (default: {authkey_path(port)})
+
+        Raises:
+            ValueError: host is not a loopback address.
+        """
+
+        if not ipaddress.ip_address(address[0]).is_loopback:
+            raise ValueError("frame server only listens on loopback addresses")
+
+        # the handshake runs in the thread of each client (see self._handle), not in accept()
+        self._authkey = os.urandom(32)
+        self._closed = False
+
+        self._listener = Listener(address)
+
+        # the port is known only now, if port 0 was requested
+        self._key_path = key_path or authkey_path(self.address[1])
+        _write_authkey(self._key_path, self._authkey)
+
+        self._decoders = {}
+        self._decoders_lock = threading.Lock()
+
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_size = cache_size * 1024 * 1024
+        self._cache_lock = threading.Lock()
+
+    @property
+    def address(self):
+        """
+        Address getter.
+
+        Returns:
+            tuple -- (host, port) the server listens on
+        """
+
+        return self._listener.address
+
+    @property
+    def key_path(self):
+        """
+        Key file path getter.
+
+        Returns:
+            string -- path of the file with the key of the server
+        """
+
+        return self._key_path
+
+    def serve_forever(self):
+        """
+        Accept clients and handle each of them in its own thread until the server is closed.
+        """
+
+        while not self._closed:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                # e.g. a client, which gave up while connecting, must not stop the server
+                continue
+
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def close(self):
+        """
+        Stop accepting clients and remove the key file.
+        """
+
+        self._closed = True
+
+        # wake up an accept() of another thread, so that serve_forever sees the close
+        try:
+            socket.create_connection(self.address, timeout=1).close()
+        except OSError:
+            pass
+
+        self._listener.close()
+
+        if os.path.exists(self._key_path):
+            os.remove(self._key_path)
+
+    def _decoder(self, path):
+        """
+        Get the decoder of a video, create it if needed.
+
+        Arguments:
+            path {string} -- path to video file
+
+        Returns:
+            _Decoder -- decoder
+        """
+
+        with self._decoders_lock:
+            if path not in self._decoders:
+                self._decoders[path] = _Decoder(path)
+
+            return self._decoders[path]
+
+    def _read(self, path, index, config, transform):
+        """
+        Get a transformed frame from the cache or decode it.
+
+        Arguments:
+            path {string} -- path to video file
+            index {int} -- frame index
+            config {dict} -- config, which is passed to the transform
+            transform {string} -- name of the transform in TRANSFORMS or None
+
+        Raises:
+            ValueError: unknown transform.
+
+        Returns:
+            opencv image -- frame or None if it could not be read
+        """
+
+        if transform is not None and transform not in TRANSFORMS:
+            raise ValueError("unknown transform: {}".format(transform))
+
+        image_func = TRANSFORMS.get(transform)
+
+        key = (path, index, _transform_key(config, transform))
+
+        with self._cache_lock:
+            frame = self._cache.get(key)
+
+            if frame is not None:
+                self._cache.move_to_end(key)
+                return frame
+
+        ret, frame = self._decoder(path).read(index)
+
+        if not ret:
+            return None
+
+        if image_func:
+            frame = image_func(transform_config(config), frame)
+
+        with self._cache_lock:
+            if key not in self._cache:
+                self._cache[key] = frame
+                self._cache_bytes += frame.nbytes
+
+            # evict least recently used frames
+            while self._cache_bytes > self._cache_size and self._cache:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.nbytes
+
+        return frame
+
+    def _handle(self, connection):
+        """
+        Authenticate a single client and answer its requests until it disconnects. A client, which
+        does not know the key, disconnects or stalls during the handshake, only ends or blocks its
+        own thread.
+
+        Arguments:
+            connection {Connection} -- connection to the client
+        """
+
+        with connection:
+            try:
+                deliver_challenge(connection, self._authkey)
+                answer_challenge(connection, self._authkey)
+            except (AuthenticationError, EOFError, OSError):
+                return
+
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    if request["cmd"] == "open":
+                        response = self._decoder(request["path"]).info
+                    elif request["cmd"] == "read":
+                        response = self._read(request["path"], request["index"], request["config"], request["transform"])
+                    else:
+                        response = ValueError("unknown command: {}".format(request["cmd"]))
+                except Exception as exception:
+                    response = exception
+
+                connection.send(response)
+
+
+class FrameClient(FrameSource):
+    """
+    FrameClient class, a frame source, which reads transformed frames of a video from a
+    FrameServer.
+    """
+
+    def __init__(self, path, config, image_func=None, address=DEFAULT_ADDRESS, key_path=None):
+        """
+        FrameClient constructor.
+
+        Arguments:
+            path {string} -- path to video file (as seen by the server)
+            config {dict} -- config, which is passed to image_func
+
+        Keyword Arguments:
+            image_func {python function} -- function of TRANSFORMS that somehow converts the image, applied by the server (default: None)
+            address {tuple} -- (host, port) of the server (default: {DEFAULT_ADDRESS})
+            key_path {string} -- file with the key of the server (default: {authkey_path(port)})
+
+        Raises:
+            ValueError: the server can not apply image_func.
+        """
+
+        self._path = path
+        self._config = config
+        self._transform = transform_name(image_func)
+
+        self._connection = Client(address, authkey=read_authkey(key_path or authkey_path(address[1])))
+
+        info = self._request({"cmd": "open", "path": path})
+
+        self.frame_count = info["frame_count"]
+        self.fps = info["fps"]
+        self.width = info["width"]
+        self.height = info["height"]
+
+    def _request(self, request):
+        """
+        Send a request to the server and wait for the response.
+
+        Arguments:
+            request {dict} -- request
+
+        Raises:
+            Exception: exception raised by the server
+
+        Returns:
+            object -- response
+        """
+
+        self._connection.send(request)
+        response = self._connection.recv()
+
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+    def read(self, index):
+        """
+        Read a transformed frame.
+
+        Arguments:
+            index {int} -- frame index
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        frame = self._request({"cmd": "read", "path": self._path, "index": index,
+                               "config": self._config, "transform": self._transform})
+
+        return frame is not None, frame
+
+    def release(self):
+        """
+        Close the connection to the server.
+        """
+
+        self._connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='serve decoded frames to multiple label tools on this host')
+
+    parser.add_argument('--host', type=str, default=DEFAULT_ADDRESS[0], help='loopback address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_ADDRESS[1], help='port to listen on')
+    parser.add_argument('--cache', type=int, default=1024, help='size of the frame cache in MB')
+    parser.add_argument('--key-file', type=str, default=None,
+                        help='file, into which the key of the server is written. default: ~/.label_tool/frame_server_PORT.key')
+
+    args = parser.parse_args()
+
+    server = FrameServer((args.host, args.port), cache_size=args.cache, key_path=args.key_file)
+
+    print("frame server listening on {}:{}, key in {}".format(*server.address, server.key_path))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+FrameSource Module
+
+Frame sources give indexed access to the frames of a video, a directory of images or a NumPy
+array stack, so that the label tool and the background workers do not depend on the format of
+the input.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import cv2 as cv
+import numpy as np
+
+# gaps up to this number of frames are skipped with grab() instead of seeking
+MAX_GRAB_GAP = 16
+
+# fps of sources, which do not store a frame rate
+DEFAULT_FPS = 25.0
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+
+
+class FrameSource:
+    """
+    FrameSource class, the interface of all frame sources. Subclasses set frame_count, fps, width
+    and height and implement read().
+    """
+
+    frame_count = 0
+    fps = DEFAULT_FPS
+    width = 0
+    height = 0
+
+    def read(self, index):
+        """
+        Read the frame with the given index.
+
+        Arguments:
+            index {int} -- frame index
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        raise NotImplementedError
+
+    def iterate(self, start=0, stop=None, step=1):
+        """
+        Iterate over every step-th frame of [start, stop).
+
+        Keyword Arguments:
+            start {int} -- first frame (default: {0})
+            stop {int} -- frame after the last frame (default: {frame_count})
+            step {int} -- distance between two frames (default: {1})
+
+        Yields:
+            tuple -- (frame index, frame) until the first frame, which can not be read
+        """
+
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+
+        for index in range(start, stop, step):
+            ret, frame = self.read(index)
+
+            if not ret:
+                return
+
+            yield index, frame
+
+    def release(self):
+        """
+        Release all resources of the source.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class VideoSource(FrameSource):
+    """
+    VideoSource class, which decodes a video file with OpenCV. It remembers the position of the
+    decoder, so that small forward gaps are skipped with grab() and only larger jumps seek.
+    """
+
+    def __init__(self, path, max_grab_gap=MAX_GRAB_GAP):
+        """
+        VideoSource constructor.
+
+        Arguments:
+            path {string} -- path to video file
+
+        Keyword Arguments:
+            max_grab_gap {int} -- gaps up to this number of frames are skipped with grab() (default: {MAX_GRAB_GAP})
+        """
+
+        self._video = cv.VideoCapture(path)
+        self._position = 0
+        self._max_grab_gap = max_grab_gap
+
+        self.frame_count = int(self._video.get(cv.CAP_PROP_FRAME_COUNT))
+        self.fps = self._video.get(cv.CAP_PROP_FPS) or DEFAULT_FPS
+        self.width = int(self._video.get(cv.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._video.get(cv.CAP_PROP_FRAME_HEIGHT))
+
+    def read(self, index):
+        """
+        Decode the frame with the given index.
+
+        Arguments:
+            index {int} -- frame index
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        if index < 0 or index >= self.frame_count:
+            return False, None
+
+        if 0 < index - self._position <= self._max_grab_gap:
+            while self._position < index:
+                self._video.grab()
+                self._position += 1
+        elif index != self._position:
+            self._video.set(cv.CAP_PROP_POS_FRAMES, index)
+
+        ret, frame = self._video.read()
+        self._position = index + 1
+
+        return ret, frame
+
+    def iterate(self, start=0, stop=None, step=1):
+        """
+        Iterate over every step-th frame of [start, stop) in one sequential pass: the decoder seeks
+        once and skips the frames in between with grab().
+
+        Keyword Arguments:
+            start {int} -- first frame (default: {0})
+            stop {int} -- frame after the last frame (default: {frame_count})
+            step {int} -- distance between two frames (default: {1})
+
+        Yields:
+            tuple -- (frame index, frame) until the first frame, which can not be read
+        """
+
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+
+        if start >= stop:
+            return
+
+        if start != self._position:
+            self._video.set(cv.CAP_PROP_POS_FRAMES, start)
+            self._position = start
+
+        for index in range(start, stop, step):
+            while self._position < index:
+                if not self._video.grab():
+                    return
+
+                self._position += 1
+
+            ret, frame = self._video.read()
+            self._position = index + 1
+
+            if not ret:
+                return
+
+            yield index, frame
+
+    def release(self):
+        """
+        Release the decoder.
+        """
+
+        self._video.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """
+    ImageDirectorySource class, which reads the images of a directory in the order of their file
+    names. The following frames are decoded ahead on a thread pool in the direction of the last
+    reads, so that playback does not wait for single image decodes.
+    """
+
+    def __init__(self, path, fps=DEFAULT_FPS, workers=4, read_ahead=8):
+        """
+        ImageDirectorySource constructor.
+
+        Arguments:
+            path {string} -- path to image directory
+
+        Keyword Arguments:
+            fps {float} -- frame rate of the images (default: {DEFAULT_FPS})
+            workers {int} -- number of decoding threads (default: {4})
+            read_ahead {int} -- number of frames, which are decoded ahead (default: {8})
+        """
+
+        self._files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+
+        self._read_ahead = read_ahead
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}
+        self._last_index = None
+
+        self.frame_count = len(self._files)
+        self.fps = fps
+
+        if self._files:
+            first = cv.imread(self._files[0])
+            self.height, self.width = first.shape[:2]
+
+    def read(self, index):
+        """
+        Read the image with the given index and decode the next ones in the background.
+
+        Arguments:
+            index {int} -- frame index
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        if index < 0 or index >= self.frame_count:
+            return False, None
+
+        # distance and direction of the last two reads, e.g. the stride or backwards stepping
+        step = index - self._last_index if self._last_index is not None else 1
+
+        if step == 0:
+            step = 1
+
+        self._last_index = index
+
+        future = self._pending.pop(index, None) or self._executor.submit(cv.imread, self._files[index])
+
+        # keep decoding ahead in the direction of the reads, drop everything else
+        ahead = [index + i * step for i in range(1, self._read_ahead + 1)]
+        ahead = [i for i in ahead if 0 <= i < self.frame_count]
+
+        for stale in set(self._pending) - set(ahead):
+            self._pending.pop(stale).cancel()
+
+        for i in ahead:
+            if i not in self._pending:
+                self._pending[i] = self._executor.submit(cv.imread, self._files[i])
+
+        frame = future.result()
+
+        return frame is not None, frame
+
+    def release(self):
+        """
+        Stop the decoding threads.
+        """
+
+        for future in self._pending.values():
+            future.cancel()
+
+        self._pending.clear()
+        self._executor.shutdown()
+
+
+class ArraySource(FrameSource):
+    """
+    ArraySource class, which reads frames from a .npy stack with shape (n, height, width, 3) in
+    BGR or (n, height, width) in grayscale. The file is memory-mapped, so color frames are
+    returned as read-only views without copying.
+    """
+
+    def __init__(self, path, fps=DEFAULT_FPS):
+        """
+        ArraySource constructor.
+
+        Arguments:
+            path {string} -- path to .npy file
+
+        Keyword Arguments:
+            fps {float} -- frame rate of the frames (default: {DEFAULT_FPS})
+        """
+
+        self._frames = np.load(path, mmap_mode="r")
+
+        self.frame_count = self._frames.shape[0]
+        self.fps = fps
+        self.height, self.width = self._frames.shape[1:3]
+
+    def read(self, index):
+        """
+        Get the frame with the given index.
+
+        Arguments:
+            index {int} -- frame index
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        if index < 0 or index >= self.frame_count:
+            return False, None
+
+        frame = self._frames[index]
+
+        # the rest of the tool works on color images
+        if frame.ndim == 2:
+            frame = cv.cvtColor(np.asarray(frame), cv.COLOR_GRAY2BGR)
+
+        return True, frame
+
+    def release(self):
+        """
+        Close the memory map.
+        """
+
+        self._frames = None
+
+
+def open_frame_source(path, fps=None, max_grab_gap=MAX_GRAB_GAP):
+    """
+    Open the frame source, which fits the path: a directory of images, a .npy stack or a video
+    file.
+
+    Arguments:
+        path {string} -- path to video file, image directory or .npy file
+
+    Keyword Arguments:
+        fps {float} -- frame rate of image directories and .npy stacks (default: {DEFAULT_FPS})
+        max_grab_gap {int} -- gaps up to this number of frames are skipped with grab() in videos (default: {MAX_GRAB_GAP})
+
+    Returns:
+        FrameSource -- frame source
+    """
+
+    if os.path.isdir(path):
+        return ImageDirectorySource(path, fps or DEFAULT_FPS)
+
+    if path.lower().endswith(".npy"):
+        return ArraySource(path, fps or DEFAULT_FPS)
+
+    return VideoSource(path, max_grab_gap)
+
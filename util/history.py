@@ -0,0 +1,252 @@
+"""
+EditHistory Module
+"""
+from collections import deque
+
+# rough memory estimate of the parts of a step in bytes
+STEP_OVERHEAD = 120
+DELTA_OVERHEAD = 100
+ROI_SIZE = 90
+
+
+def _freeze_value(value):
+    """
+    Convert lists recursively into tuples.
+
+    Arguments:
+        value {object} -- value of a result entry
+
+    Returns:
+        object -- immutable value
+    """
+
+    if isinstance(value, list):
+        return tuple(_freeze_value(item) for item in value)
+
+    return value
+
+
+def _thaw_value(value):
+    """
+    Convert tuples recursively back into lists.
+
+    Arguments:
+        value {object} -- immutable value
+
+    Returns:
+        object -- value of a result entry
+    """
+
+    if isinstance(value, tuple):
+        return [_thaw_value(item) for item in value]
+
+    return value
+
+
+def freeze(entry):
+    """
+    Convert a result entry into an immutable state, which can be shared between steps.
+
+    Arguments:
+        entry {dict} -- result entry or None
+
+    Returns:
+        tuple -- sorted (key, value) pairs with lists converted into tuples or None
+    """
+
+    if entry is None:
+        return None
+
+    return tuple(sorted((key, _freeze_value(value)) for key, value in entry.items()))
+
+
+def thaw(state):
+    """
+    Convert an immutable state back into a result entry.
+
+    Arguments:
+        state {tuple} -- sorted (key, value) pairs or None
+
+    Returns:
+        dict -- result entry or None
+    """
+
+    if state is None:
+        return None
+
+    return {key: _thaw_value(value) for key, value in state}
+
+
+def _roi_count(value):
+    """
+    Count the rois (innermost tuples) of a frozen value.
+
+    Arguments:
+        value {object} -- frozen value
+
+    Returns:
+        int -- number of rois
+    """
+
+    if not isinstance(value, tuple):
+        return 0
+
+    if value and all(not isinstance(item, tuple) for item in value):
+        return 1
+
+    return sum(_roi_count(item) for item in value)
+
+
+def _state_size(state):
+    """
+    Estimate the memory of a state.
+
+    Arguments:
+        state {tuple} -- frozen result entry, tuple of event spans or None
+
+    Returns:
+        int -- size in bytes
+    """
+
+    if state is None:
+        return 0
+
+    return ROI_SIZE * _roi_count(state)
+
+
+class EditHistory:
+    """
+    EditHistory class, which keeps an undo/redo log of the edits of the results. Every step only
+    stores the states of the changed frames (or event ranges) before and after the edit, so the
+    memory of a step does not depend on the size of the label set. Equal states of consecutive steps are shared
+    and the oldest steps are dropped, if the history exceeds its memory budget.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        """
+        EditHistory constructor.
+
+        Keyword Arguments:
+            max_bytes {int} -- memory budget of the history in bytes (default: {16 MiB})
+        """
+
+        self._max_bytes = max_bytes
+
+        self._undo_steps = deque()
+        self._redo_steps = []
+        self._bytes = 0
+
+    def record(self, deltas):
+        """
+        Record a step. A new step discards all steps, which could be redone.
+
+        Arguments:
+            deltas {list} -- list of (key, before, after) tuples with frozen states, key is a frame index or an ("events", start, end) range
+        """
+
+        deltas = [delta for delta in deltas if delta is not None and delta[1] != delta[2]]
+
+        if not deltas:
+            return
+
+        deltas = [self._share(delta) for delta in deltas]
+
+        self._redo_steps.clear()
+        self._push(self._undo_steps, tuple(deltas))
+
+        # drop the oldest steps, if the memory budget is exceeded
+        while self._bytes > self._max_bytes and len(self._undo_steps) > 1:
+            self._bytes -= self._step_size(self._undo_steps.popleft())
+
+    def undo(self):
+        """
+        Undo the last step.
+
+        Returns:
+            list -- list of (key, state) tuples, which have to be applied, or None if there is nothing to undo
+        """
+
+        if not self._undo_steps:
+            return None
+
+        step = self._undo_steps.pop()
+        self._bytes -= self._step_size(step)
+        self._redo_steps.append(step)
+
+        return [(key, before) for key, before, _ in reversed(step)]
+
+    def redo(self):
+        """
+        Redo the last undone step.
+
+        Returns:
+            list -- list of (key, state) tuples, which have to be applied, or None if there is nothing to redo
+        """
+
+        if not self._redo_steps:
+            return None
+
+        step = self._redo_steps.pop()
+        self._push(self._undo_steps, step)
+
+        return [(key, after) for key, _, after in step]
+
+    @property
+    def size(self):
+        """
+        Estimated memory of the undo steps getter.
+
+        Returns:
+            int -- size in bytes
+        """
+
+        return self._bytes
+
+    def _push(self, steps, step):
+        """
+        Push a step onto the undo steps and account for its memory.
+
+        Arguments:
+            steps {deque} -- undo steps
+            step {tuple} -- step
+        """
+
+        steps.append(step)
+        self._bytes += self._step_size(step)
+
+    def _share(self, delta):
+        """
+        Reuse the after state of the previous step as before state, if it is equal, e.g. for
+        consecutive edits of the same frame.
+
+        Arguments:
+            delta {tuple} -- (key, before, after)
+
+        Returns:
+            tuple -- (key, before, after)
+        """
+
+        key, before, after = delta
+
+        if self._undo_steps:
+            for previous_key, _, previous_after in self._undo_steps[-1]:
+                if previous_key == key and previous_after == before:
+                    return (key, previous_after, after)
+
+        return delta
+
+    @staticmethod
+    def _step_size(step):
+        """
+        Estimate the memory of a step. Shared states are counted for every step, so this is an
+        upper bound.
+
+        Arguments:
+            step {tuple} -- step
+
+        Returns:
+            int -- size in bytes
+        """
+
+        return STEP_OVERHEAD + sum(DELTA_OVERHEAD + _state_size(before) + _state_size(after)
+                                   for _, before, after in step)
@@ -0,0 +1,390 @@
+"""
+LabelIndex Module
+"""
+from bisect import bisect_left, bisect_right, insort
+
+from util.event_intervals import EventIntervals
+
+
+def _contains(frames, frame):
+    """
+    Check if frame is part of the sorted frame list.
+
+    Arguments:
+        frames {list} -- sorted list of frame indices
+        frame {int} -- frame index
+
+    Returns:
+        bool -- True if frame is in frames
+    """
+
+    i = bisect_left(frames, frame)
+
+    return i < len(frames) and frames[i] == frame
+
+
+def _discard(frames, frame):
+    """
+    Remove frame from the sorted frame list if it is part of it.
+
+    Arguments:
+        frames {list} -- sorted list of frame indices
+        frame {int} -- frame index
+    """
+
+    i = bisect_left(frames, frame)
+
+    if i < len(frames) and frames[i] == frame:
+        del frames[i]
+
+
+def _run_start(frames, frame):
+    """
+    Get the first frame of the run of consecutive frames containing frame.
+    Inside such a run frames[j] - j is constant, which allows a binary search.
+
+    Arguments:
+        frames {list} -- sorted list of frame indices
+        frame {int} -- frame index (has to be part of frames)
+
+    Returns:
+        int -- first frame of the run
+    """
+
+    i = bisect_left(frames, frame)
+    offset = frames[i] - i
+
+    low, high = 0, i
+
+    while low < high:
+        mid = (low + high) // 2
+
+        if frames[mid] - mid == offset:
+            high = mid
+        else:
+            low = mid + 1
+
+    return frames[low]
+
+
+def _run_end(frames, frame):
+    """
+    Get the last frame of the run of consecutive frames containing frame.
+
+    Arguments:
+        frames {list} -- sorted list of frame indices
+        frame {int} -- frame index (has to be part of frames)
+
+    Returns:
+        int -- last frame of the run
+    """
+
+    i = bisect_left(frames, frame)
+    offset = frames[i] - i
+
+    low, high = i, len(frames) - 1
+
+    while low < high:
+        mid = (low + high + 1) // 2
+
+        if frames[mid] - mid == offset:
+            low = mid
+        else:
+            high = mid - 1
+
+    return frames[low]
+
+
+class LabelIndex:
+    """
+    LabelIndex class, which keeps a sorted list of the frames with rois next to the event
+    intervals, so that the next or previous labeled frame, event change or unlabeled gap can be
+    found with bisect instead of stepping through the video. A frame is labeled, if it has rois or
+    an event.
+    """
+
+    def __init__(self, results=None, events=None):
+        """
+        LabelIndex constructor.
+
+        Keyword Arguments:
+            results {dict} -- results of the labelling (default: {None})
+            events {EventIntervals} -- event intervals of the labelling (default: {None})
+        """
+
+        # frames with rois
+        self._roi_frames = []
+
+        self._events = events if events is not None else EventIntervals()
+
+        # incremented on every change of the rois, so that views can cache what they derive from the index
+        self._roi_version = 0
+
+        if results:
+            for frame in sorted(results):
+                self.update(frame, results[frame])
+
+    def update(self, frame, entry):
+        """
+        Update the index for a single frame. Events are updated in the event intervals directly.
+
+        Arguments:
+            frame {int} -- frame index
+            entry {dict} -- result entry of the frame or None if the frame has no results
+        """
+
+        has_rois = bool(entry) and (bool(entry.get("rois")) or any(entry.get("camera_rois") or []))
+
+        if has_rois == _contains(self._roi_frames, frame):
+            return
+
+        if has_rois:
+            insort(self._roi_frames, frame)
+        else:
+            _discard(self._roi_frames, frame)
+
+        self._roi_version += 1
+
+    @property
+    def events(self):
+        """
+        Event intervals getter.
+
+        Returns:
+            EventIntervals -- event intervals
+        """
+
+        return self._events
+
+    def event(self, frame):
+        """
+        Get the event of the given frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            string -- event of the frame or None
+        """
+
+        return self._events.get(frame)
+
+    @property
+    def version(self):
+        """
+        Version getter.
+
+        Returns:
+            int -- number of changes of the index
+        """
+
+        return self._roi_version + self._events.version
+
+    @property
+    def roi_frames(self):
+        """
+        Frames with rois getter.
+
+        Returns:
+            list -- sorted list of frame indices
+        """
+
+        return list(self._roi_frames)
+
+    def is_labeled(self, frame):
+        """
+        Check if the given frame has rois or an event.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            bool -- True if the frame is labeled
+        """
+
+        return _contains(self._roi_frames, frame) or self._events.get(frame) is not None
+
+    def next_labeled(self, frame):
+        """
+        Get the next labeled frame after the given frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        candidates = []
+
+        i = bisect_right(self._roi_frames, frame)
+
+        if i < len(self._roi_frames):
+            candidates.append(self._roi_frames[i])
+
+        if self._events.get(frame + 1) is not None:
+            candidates.append(frame + 1)
+        else:
+            candidates.append(self._events.next_start(frame))
+
+        candidates = [candidate for candidate in candidates if candidate is not None]
+
+        return min(candidates) if candidates else None
+
+    def previous_labeled(self, frame):
+        """
+        Get the previous labeled frame before the given frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        candidates = []
+
+        i = bisect_left(self._roi_frames, frame)
+
+        if i > 0:
+            candidates.append(self._roi_frames[i - 1])
+
+        if self._events.get(frame - 1) is not None:
+            candidates.append(frame - 1)
+        else:
+            candidates.append(self._events.previous_end(frame - 1))
+
+        candidates = [candidate for candidate in candidates if candidate is not None and candidate >= 0]
+
+        return max(candidates) if candidates else None
+
+    def next_event_change(self, frame):
+        """
+        Get the first frame after the given frame, whose event differs from the event of its
+        predecessor.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        return self._events.next_change(frame)
+
+    def previous_event_change(self, frame):
+        """
+        Get the last frame before the given frame, whose event differs from the event of its
+        predecessor.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        return self._events.previous_change(frame)
+
+    def next_gap(self, frame):
+        """
+        Get the first frame of the next unlabeled gap after the given frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        labeled = frame if self.is_labeled(frame) else self.next_labeled(frame)
+
+        if labeled is None:
+            return None
+
+        return self._labeled_run_end(labeled) + 1
+
+    def previous_gap(self, frame):
+        """
+        Get the first frame of the previous unlabeled gap before the given frame.
+
+        Arguments:
+            frame {int} -- frame index
+
+        Returns:
+            int -- frame index or None
+        """
+
+        if frame <= 0:
+            return None
+
+        unlabeled = frame - 1
+
+        if self.is_labeled(unlabeled):
+            unlabeled = self._labeled_run_start(unlabeled) - 1
+
+        if unlabeled < 0:
+            return None
+
+        previous = self.previous_labeled(unlabeled)
+
+        return previous + 1 if previous is not None else 0
+
+    def _labeled_run_end(self, frame):
+        """
+        Get the last frame of the run of labeled frames containing the given frame. The run can
+        consist of alternating roi runs and event spans.
+
+        Arguments:
+            frame {int} -- labeled frame index
+
+        Returns:
+            int -- frame index
+        """
+
+        while True:
+            end = frame
+            span = self._events.span_at(end)
+
+            if span:
+                end = span[1] - 1
+
+            if _contains(self._roi_frames, end):
+                end = _run_end(self._roi_frames, end)
+
+            if end == frame:
+                if not self.is_labeled(frame + 1):
+                    return frame
+
+                end = frame + 1
+
+            frame = end
+
+    def _labeled_run_start(self, frame):
+        """
+        Get the first frame of the run of labeled frames containing the given frame.
+
+        Arguments:
+            frame {int} -- labeled frame index
+
+        Returns:
+            int -- frame index
+        """
+
+        while True:
+            start = frame
+            span = self._events.span_at(start)
+
+            if span:
+                start = span[0]
+
+            if _contains(self._roi_frames, start):
+                start = _run_start(self._roi_frames, start)
+
+            if start == frame:
+                if frame == 0 or not self.is_labeled(frame - 1):
+                    return frame
+
+                start = frame - 1
+
+            frame = start
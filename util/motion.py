@@ -0,0 +1,83 @@
+"""
+Motion Module
+"""
+import numpy as np
+
+from util.prepass import read_small_gray, run_chunked, load_or_compute
+
+# size of the downscaled grayscale frames, which are compared
+MOTION_SIZE = (64, 36)
+
+
+def _motion_chunk(video_path, start, stop):
+    """
+    Compute the motion scores of the frames [start, stop). The frame before start is decoded as
+    well, so that the first score of the chunk is a real difference.
+
+    Arguments:
+        video_path {string} -- path to video file
+        start {int} -- first frame
+        stop {int} -- frame after the last frame
+
+    Returns:
+        numpy array -- motion score per frame
+    """
+
+    first = max(start - 1, 0)
+    frames = read_small_gray(video_path, first, stop, MOTION_SIZE).astype(np.int16)
+
+    scores = np.zeros(stop - start, np.float32)
+    differences = np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2))
+
+    if start == 0:
+        # the first frame of the video has no predecessor and always counts as motion
+        scores[0] = np.inf
+        scores[1:1 + len(differences)] = differences
+    else:
+        scores[:len(differences)] = differences
+
+    return scores
+
+
+def compute_motion_scores(video_path, frame_count, workers=None):
+    """
+    Compute a cheap motion score for every frame of a video: the mean absolute difference to the
+    previous frame on heavily downscaled grayscale images.
+
+    Arguments:
+        video_path {string} -- path to video file
+        frame_count {int} -- number of frames of the video
+
+    Keyword Arguments:
+        workers {int} -- number of parallel workers (default: {number of cpus})
+
+    Returns:
+        numpy array -- motion score per frame
+    """
+
+    return run_chunked(video_path, frame_count, _motion_chunk, workers)
+
+
+def load_motion_scores(video_path, frame_count, workers=None):
+    """
+    Load the motion scores stored next to the video or compute them.
+
+    Arguments:
+        video_path {string} -- path to video file
+        frame_count {int} -- number of frames of the video
+
+    Keyword Arguments:
+        workers {int} -- number of parallel workers (default: {number of cpus})
+
+    Returns:
+        numpy array -- motion score per frame
+    """
+
+    scores = load_or_compute("{}.motion.npy".format(video_path), video_path,
+                             lambda: compute_motion_scores(video_path, frame_count, workers))
+
+    if len(scores) != frame_count:
+        scores = compute_motion_scores(video_path, frame_count, workers)
+        np.save("{}.motion.npy".format(video_path), scores)
+
+    return scores
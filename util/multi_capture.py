@@ -0,0 +1,150 @@
+"""
+MultiCapture Module
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+import cv2 as cv
+import numpy as np
+
+from util.frame_source import open_frame_source
+
+
+class MultiCapture:
+    """
+    MultiCapture class, which decodes several time-synchronized cameras in parallel threads. The
+    first camera is the reference: its frame index is mapped to the other cameras by time, using
+    their fps and time offset. The frames are tiled into one image.
+    """
+
+    def __init__(self, reference, cameras, config, image_func=None):
+        """
+        MultiCapture constructor.
+
+        Arguments:
+            reference {FrameSource} -- already opened reference camera, it is not released by the MultiCapture
+            cameras {list} -- list of (path, offset in seconds) tuples of the further cameras
+            config {dict} -- config, which is passed to image_func, its "fps" is used for image directories and .npy stacks
+
+        Keyword Arguments:
+            image_func {python function} -- function that somehow converts the image (default: None)
+        """
+
+        self._streams = [reference] + [open_frame_source(path, config.get("fps")) for path, _ in cameras]
+        self._offsets = [0] + [offset for _, offset in cameras]
+        self._config = config
+        self._image_func = image_func
+
+        self._columns = math.ceil(math.sqrt(len(self._streams)))
+        self._rows = math.ceil(len(self._streams) / self._columns)
+
+        self._tile_size = None
+
+        # one thread per camera, so that a frame takes as long as the slowest decoder
+        self._executor = ThreadPoolExecutor(max_workers=len(self._streams))
+
+    @property
+    def camera_count(self):
+        """
+        Camera count getter.
+
+        Returns:
+            int -- number of cameras
+        """
+
+        return len(self._streams)
+
+    def origin(self, camera):
+        """
+        Get the position of the tile of a camera in the tiled image.
+
+        Arguments:
+            camera {int} -- index of the camera
+
+        Returns:
+            tuple -- (x, y) of the top left corner of the tile
+        """
+
+        width, height = self._tile_size
+
+        return (camera % self._columns) * width, (camera // self._columns) * height
+
+    @property
+    def tile_size(self):
+        """
+        Tile size getter.
+
+        Returns:
+            tuple -- (width, height) of a single tile
+        """
+
+        return self._tile_size
+
+    def _read_stream(self, camera, frame_counter):
+        """
+        Read and convert the frame of a camera, which belongs to the frame of the reference camera.
+
+        Arguments:
+            camera {int} -- index of the camera
+            frame_counter {int} -- frame index of the reference camera
+
+        Returns:
+            tuple -- (ret, frame)
+        """
+
+        reference = self._streams[0]
+        stream = self._streams[camera]
+
+        timestamp = frame_counter / reference.fps + self._offsets[0] - self._offsets[camera]
+        ret, frame = stream.read(int(round(timestamp * stream.fps)))
+
+        if ret and self._image_func:
+            frame = self._image_func(self._config, frame)
+
+        return ret, frame
+
+    def read(self, frame_counter):
+        """
+        Read the frames of all cameras in parallel and tile them. Cameras without a frame for the
+        given time are shown black.
+
+        Arguments:
+            frame_counter {int} -- frame index of the reference camera
+
+        Returns:
+            tuple -- (ret, tiled frame), ret is False if the reference camera has no frame
+        """
+
+        futures = [self._executor.submit(self._read_stream, camera, frame_counter)
+                   for camera in range(len(self._streams))]
+        frames = [future.result() for future in futures]
+
+        if not frames[0][0]:
+            return False, None
+
+        if self._tile_size is None:
+            self._tile_size = (frames[0][1].shape[1], frames[0][1].shape[0])
+
+        width, height = self._tile_size
+        tiled = np.zeros((self._rows * height, self._columns * width, 3), np.uint8)
+
+        for camera, (ret, frame) in enumerate(frames):
+            if not ret:
+                continue
+
+            if (frame.shape[1], frame.shape[0]) != self._tile_size:
+                frame = cv.resize(frame, self._tile_size, interpolation=cv.INTER_AREA)
+
+            x, y = self.origin(camera)
+            tiled[y:y + height, x:x + width] = frame
+
+        return True, tiled
+
+    def release(self):
+        """
+        Release the decoders of the further cameras.
+        """
+
+        self._executor.shutdown()
+
+        for stream in self._streams[1:]:
+            stream.release()
@@ -0,0 +1,109 @@
+"""
+Prepass Module
+
+Helpers for pre-passes over a whole video, which are computed in parallel chunks and cached
+next to the video.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import cv2 as cv
+import numpy as np
+
+from util.frame_source import open_frame_source
+
+
+def chunk_ranges(frame_count, chunk_count):
+    """
+    Split the frames of a video into contiguous chunks of roughly equal size.
+
+    Arguments:
+        frame_count {int} -- number of frames of the video
+        chunk_count {int} -- number of chunks
+
+    Returns:
+        list -- list of (start, stop) tuples
+    """
+
+    chunk_count = max(min(chunk_count, frame_count), 1)
+    edges = np.linspace(0, frame_count, chunk_count + 1).astype(int)
+
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+
+def read_small_gray(video_path, start, stop, size):
+    """
+    Decode the frames [start, stop) of a video as heavily downscaled grayscale images.
+
+    Arguments:
+        video_path {string} -- path to video file, image directory or .npy file
+        start {int} -- first frame
+        stop {int} -- frame after the last frame
+        size {tuple} -- (width, height) of the downscaled frames
+
+    Returns:
+        numpy array -- frames with shape (n, height, width), n can be smaller than stop - start
+    """
+
+    frames = np.empty((stop - start, size[1], size[0]), np.uint8)
+    frame_number = 0
+
+    with open_frame_source(video_path) as source:
+        for _, frame in source.iterate(start, stop):
+            gray = cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+            frames[frame_number] = cv.resize(gray, size, interpolation=cv.INTER_AREA)
+
+            frame_number += 1
+
+    return frames[:frame_number]
+
+
+def run_chunked(video_path, frame_count, chunk_func, workers=None):
+    """
+    Run chunk_func over the whole video in parallel chunks and concatenate the results. OpenCV
+    releases the GIL while decoding, so threads are sufficient.
+
+    Arguments:
+        video_path {string} -- path to video file
+        frame_count {int} -- number of frames of the video
+        chunk_func {python function} -- function (video_path, start, stop) -> numpy array with one value per frame
+
+    Keyword Arguments:
+        workers {int} -- number of parallel workers (default: {number of cpus})
+
+    Returns:
+        numpy array -- concatenated results of all chunks
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(chunk_func, video_path, start, stop)
+                   for start, stop in chunk_ranges(frame_count, workers)]
+
+        return np.concatenate([future.result() for future in futures])
+
+
+def load_or_compute(cache_path, video_path, compute):
+    """
+    Load a pre-pass result from cache_path, if it is newer than the video. Otherwise compute and
+    save it.
+
+    Arguments:
+        cache_path {string} -- path of the cached result
+        video_path {string} -- path to video file
+        compute {python function} -- function without arguments, which computes the result
+
+    Returns:
+        numpy array -- result of the pre-pass
+    """
+
+    if os.path.isfile(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(video_path):
+        try:
+            return np.load(cache_path)
+        except (OSError, ValueError):
+            print("could not load cached pre-pass {}, recomputing".format(cache_path))
+
+    result = compute()
+    np.save(cache_path, result)
+
+    return result
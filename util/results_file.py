@@ -0,0 +1,122 @@
+"""
+Results File Module
+
+The results are stored as JSON object with one entry per frame index, which holds the rois and
+the event of the frame. Every frame with an event gets an entry, so that all readers of this
+per-frame layout keep working. Optionally the events are stored compactly as list of
+[start, end, event] spans under the key "event_intervals" instead, then only frames with rois
+have an entry (with their event). Both layouts are converted into intervals on load.
+
+Frames, whose rois were edited by hand (including frames, whose rois were all deleted), are
+marked with "edited": true in their entry, so that the pre-classification never overwrites them.
+
+Entries with rois record the space of their rois in "roi_space": "frame" for the pixels of the
+converted frame (image_func, e.g. resized) or "source" for the pixels of the source (e.g. the
+zoomable view). Entries without it are in the frame space, like in older files.
+"""
+import json
+
+from util.custom_encoder import CustomEncoder
+from util.event_intervals import EventIntervals
+
+EVENT_INTERVALS_KEY = "event_intervals"
+
+EDITED_KEY = "edited"
+
+ROI_SPACE_KEY = "roi_space"
+
+# rois in the pixels of the frames converted by image_func and in the pixels of the source
+FRAME_SPACE = "frame"
+SOURCE_SPACE = "source"
+
+
+def load_results(path):
+    """
+    Load results and events from a results file.
+
+    Arguments:
+        path {string} -- path to results file
+
+    Raises:
+        json.JSONDecodeError: file is no valid JSON.
+        ValueError: the file mixes rois of different spaces.
+
+    Returns:
+        tuple -- (results, events, edited, roi_space) with results {dict} -- entries without event per frame index, events {EventIntervals} -- event intervals, edited {set} -- frames edited by hand and roi_space {string} -- FRAME_SPACE, SOURCE_SPACE or None without rois
+    """
+
+    with open(path, "r") as read_file:
+        raw_results = json.load(read_file)
+
+    spans = raw_results.pop(EVENT_INTERVALS_KEY, None)
+
+    results = {}
+    frame_events = {}
+    edited = set()
+    roi_spaces = set()
+
+    for key, value in raw_results.items():
+        frame = int(key)
+        entry = dict(value)
+
+        frame_events[frame] = entry.pop("event", None)
+        roi_space = entry.pop(ROI_SPACE_KEY, FRAME_SPACE)
+
+        if entry.pop(EDITED_KEY, False):
+            edited.add(frame)
+
+        # entries, which only held an event, are fully described by the intervals
+        if entry.get("rois") or any(entry.get("camera_rois") or []):
+            results[frame] = entry
+            roi_spaces.add(roi_space)
+
+    if len(roi_spaces) > 1:
+        raise ValueError("{} mixes rois in the spaces {}".format(path, ", ".join(sorted(roi_spaces))))
+
+    if spans is None:
+        events = EventIntervals.from_frames(frame_events)
+    else:
+        events = EventIntervals(spans)
+
+    return results, events, edited, (roi_spaces.pop() if roi_spaces else None)
+
+
+def save_results(path, results, events, event_intervals=False, edited=None, roi_space=None):
+    """
+    Save results and events to a results file.
+
+    Arguments:
+        path {string} -- path to results file
+        results {dict} -- entries without event per frame index
+        events {EventIntervals} -- event intervals
+
+    Keyword Arguments:
+        event_intervals {bool} -- store the events as spans under "event_intervals" instead of an entry of every frame, which readers of the per-frame layout do not understand (default: {False})
+        edited {set} -- frames edited by hand (default: {None})
+        roi_space {string} -- space of the rois, FRAME_SPACE or SOURCE_SPACE (default: {None, not recorded})
+    """
+
+    output = {}
+
+    for frame in results:
+        output[frame] = dict(results[frame], event=events.get(frame))
+
+        if roi_space is not None:
+            output[frame][ROI_SPACE_KEY] = roi_space
+
+    if not event_intervals:
+        for start, end, event in events.spans():
+            for frame in range(start, end):
+                output.setdefault(frame, {"rois": [], "event": event})
+
+    # frames, whose rois were deleted by hand, keep an empty entry for the mark
+    for frame in edited or ():
+        output.setdefault(frame, {"rois": [], "event": events.get(frame)})[EDITED_KEY] = True
+
+    output = {frame: output[frame] for frame in sorted(output)}
+
+    if event_intervals:
+        output[EVENT_INTERVALS_KEY] = events.to_list()
+
+    with open(path, "w") as outfile:
+        json.dump(output, outfile, cls=CustomEncoder)
@@ -0,0 +1,181 @@
+"""
+Shots Module
+"""
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+from util.prepass import read_small_gray, run_chunked, load_or_compute
+
+# size of the downscaled grayscale frames, whose histograms are compared
+SHOT_SIZE = (64, 36)
+
+# number of histogram bins of the 256 gray values
+SHOT_BINS = 32
+
+
+def _histograms(frames):
+    """
+    Compute the normalized gray value histograms of all frames at once.
+
+    Arguments:
+        frames {numpy array} -- frames with shape (n, height, width)
+
+    Returns:
+        numpy array -- histograms with shape (n, SHOT_BINS)
+    """
+
+    bins = (frames.reshape(len(frames), -1) // (256 // SHOT_BINS)).astype(np.int64)
+    bins += np.arange(len(frames), dtype=np.int64)[:, None] * SHOT_BINS
+
+    histograms = np.bincount(bins.ravel(), minlength=len(frames) * SHOT_BINS).reshape(len(frames), SHOT_BINS)
+
+    return histograms / max(bins.shape[1], 1)
+
+
+def _shot_chunk(video_path, start, stop):
+    """
+    Compute the histogram differences of the frames [start, stop) to their predecessors. The
+    frame before start is decoded as well, so that the first difference of the chunk is real.
+
+    Arguments:
+        video_path {string} -- path to video file
+        start {int} -- first frame
+        stop {int} -- frame after the last frame
+
+    Returns:
+        numpy array -- histogram difference per frame in [0, 1]
+    """
+
+    first = max(start - 1, 0)
+    histograms = _histograms(read_small_gray(video_path, first, stop, SHOT_SIZE))
+
+    scores = np.zeros(stop - start, np.float32)
+
+    # half of the L1 distance is the fraction of pixels, which changed their bin
+    differences = np.abs(np.diff(histograms, axis=0)).sum(axis=1) / 2
+
+    if start == 0:
+        # the first frame of the video starts the first shot and is no boundary
+        scores[1:1 + len(differences)] = differences
+    else:
+        scores[:len(differences)] = differences
+
+    return scores
+
+
+def compute_shot_scores(video_path, frame_count, workers=None):
+    """
+    Compute the gray value histogram difference of every frame of a video to its predecessor on
+    heavily downscaled frames. Cuts have large differences, motion inside a shot hardly changes
+    the histogram.
+
+    Arguments:
+        video_path {string} -- path to video file
+        frame_count {int} -- number of frames of the video
+
+    Keyword Arguments:
+        workers {int} -- number of parallel workers (default: {number of cpus})
+
+    Returns:
+        numpy array -- histogram difference per frame
+    """
+
+    return run_chunked(video_path, frame_count, _shot_chunk, workers)
+
+
+def load_shot_boundaries(video_path, frame_count, threshold=0.4, workers=None):
+    """
+    Load the histogram differences stored next to the video or compute them, and get the shot
+    boundaries: the frames, whose difference reaches the threshold.
+
+    Arguments:
+        video_path {string} -- path to video file
+        frame_count {int} -- number of frames of the video
+
+    Keyword Arguments:
+        threshold {float} -- minimum histogram difference of a boundary (default: {0.4})
+        workers {int} -- number of parallel workers (default: {number of cpus})
+
+    Returns:
+        list -- sorted first frames of all shots except the first one
+    """
+
+    scores = load_or_compute("{}.shots.npy".format(video_path), video_path,
+                             lambda: compute_shot_scores(video_path, frame_count, workers))
+
+    if len(scores) != frame_count:
+        scores = compute_shot_scores(video_path, frame_count, workers)
+        np.save("{}.shots.npy".format(video_path), scores)
+
+    return np.flatnonzero(scores >= threshold).tolist()
+
+
+def shot_range(boundaries, frame, frame_count):
+    """
+    Get the shot containing a frame.
+
+    Arguments:
+        boundaries {list} -- sorted shot boundaries
+        frame {int} -- frame index
+        frame_count {int} -- number of frames of the video
+
+    Returns:
+        tuple -- (first frame, frame after the last frame) of the shot
+    """
+
+    i = bisect_right(boundaries, frame)
+
+    start = boundaries[i - 1] if i > 0 else 0
+    stop = boundaries[i] if i < len(boundaries) else frame_count
+
+    return start, stop
+
+
+def crosses_boundary(boundaries, frame, other_frame):
+    """
+    Check if two frames belong to different shots.
+
+    Arguments:
+        boundaries {list} -- sorted shot boundaries
+        frame {int} -- frame index
+        other_frame {int} -- frame index
+
+    Returns:
+        bool -- True if there is a boundary between the frames
+    """
+
+    return bisect_right(boundaries, max(frame, other_frame)) != bisect_right(boundaries, min(frame, other_frame))
+
+
+def next_boundary(boundaries, frame):
+    """
+    Get the first boundary after a frame.
+
+    Arguments:
+        boundaries {list} -- sorted shot boundaries
+        frame {int} -- frame index
+
+    Returns:
+        int -- frame index or None
+    """
+
+    i = bisect_right(boundaries, frame)
+
+    return boundaries[i] if i < len(boundaries) else None
+
+
+def previous_boundary(boundaries, frame):
+    """
+    Get the last boundary before a frame.
+
+    Arguments:
+        boundaries {list} -- sorted shot boundaries
+        frame {int} -- frame index
+
+    Returns:
+        int -- frame index or None
+    """
+
+    i = bisect_left(boundaries, frame)
+
+    return boundaries[i - 1] if i > 0 else None
@@ -1,3 +1,6 @@
+import threading
+from collections import deque
+from queue import Queue, Empty
 import cv2 as cv
 
 class RoiTracker:
@@ -25,7 +28,6 @@ class RoiTracker:
         ok, roi = self._tracker.update(frame)
 
         if ok:
-            print("found roi: {}".format(roi))
             roi = list(map(int, roi))
             return roi
 
@@ -37,4 +39,186 @@ class RoiTracker:
 
     @property
     def initialized(self):
-        return self._initialized
\ No newline at end of file
+        return self._initialized
+
+
+class AsyncRoiTracker:
+    """
+    AsyncRoiTracker class, which runs a RoiTracker in a worker thread, so that tracking does not
+    stall the rendering. Frames are submitted with their index and the tracked rois are
+    collected, tagged by the same index, as soon as they are ready.
+
+    If the backlog of submitted frames reaches max_backlog, skip_policy decides what happens:
+    - "block": wait until the tracker caught up
+    - "drop": do not track the submitted frame
+    - "latest": drop the oldest waiting frame in favour of the submitted one
+    """
+
+    SKIP_POLICIES = ("block", "drop", "latest")
+
+    def __init__(self, max_backlog=8, skip_policy="drop"):
+        if skip_policy not in self.SKIP_POLICIES:
+            raise ValueError("unknown tracker skip policy: {}".format(skip_policy))
+
+        self._tracker = RoiTracker()
+        self._max_backlog = max_backlog
+        self._skip_policy = skip_policy
+
+        self._initialized = False
+        self._skipped = 0
+        self._stopped = False
+
+        self._tasks = deque()
+        # number of waiting track tasks, only changed while holding the condition
+        self._backlog = 0
+        # True while the worker handles a task outside of the lock
+        self._busy = False
+        self._condition = threading.Condition()
+        self._results = Queue()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def init_tracker(self, frame_counter, frame, roi):
+        if not roi or not any(roi[2:]):
+            self._initialized = False
+            return False
+
+        with self._condition:
+            self._tasks.append(("init", frame_counter, frame, roi))
+            self._condition.notify()
+
+        self._initialized = True
+        return True
+
+    def submit(self, frame_counter, frame):
+        """
+        Submit a frame for tracking.
+
+        Returns:
+            bool -- False if the frame was skipped
+        """
+
+        with self._condition:
+            if self._backlog >= self._max_backlog:
+                if self._skip_policy == "block":
+                    # a failed tracker is uninitialized and its tasks are cleared, so this never waits forever
+                    self._condition.wait_for(lambda: self._backlog < self._max_backlog or self._stopped or not self._initialized)
+                elif self._skip_policy == "drop":
+                    self._skipped += 1
+                    return False
+                else:
+                    # drop the oldest waiting frame, but never an init task
+                    for task in self._tasks:
+                        if task[0] == "track":
+                            self._tasks.remove(task)
+                            self._backlog -= 1
+                            self._skipped += 1
+                            break
+
+            if self._stopped or not self._initialized:
+                return False
+
+            self._tasks.append(("track", frame_counter, frame, None))
+            self._backlog += 1
+            self._condition.notify()
+
+        return True
+
+    def collect(self):
+        """
+        Get all tracked rois, which arrived since the last call.
+
+        Returns:
+            list -- list of (frame index, roi) tuples
+        """
+
+        results = []
+
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except Empty:
+                return results
+
+    def wait_idle(self):
+        """
+        Wait until all submitted frames are tracked, so that their rois can be collected.
+        """
+
+        with self._condition:
+            self._condition.wait_for(lambda: (not self._tasks and not self._busy) or self._stopped)
+
+    def destroy_tracker(self):
+        with self._condition:
+            self._tasks.clear()
+            self._backlog = 0
+            self._tasks.append(("destroy", None, None, None))
+            self._condition.notify_all()
+
+        self._initialized = False
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._tasks.clear()
+            self._backlog = 0
+            self._condition.notify_all()
+
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._tasks or self._stopped)
+
+                if self._stopped:
+                    return
+
+                task, frame_counter, frame, roi = self._tasks.popleft()
+
+                if task == "track":
+                    self._backlog -= 1
+
+                self._busy = True
+                self._condition.notify_all()
+
+            try:
+                if task == "init":
+                    if not self._tracker.init_tracker(frame, roi):
+                        self._initialized = False
+                elif task == "destroy":
+                    self._tracker.destroy_tracker()
+                elif self._tracker.initialized:
+                    tracked_roi = self._tracker.track(frame)
+
+                    if tracked_roi:
+                        self._results.put((frame_counter, tracked_roi))
+            except Exception as exception:
+                # keep the worker alive, drop the failed tracker and wake up blocked submits
+                print("tracker failed: {}".format(exception))
+
+                self._tracker.destroy_tracker()
+
+                with self._condition:
+                    # a new init, which was submitted in the meantime, stays valid
+                    self._initialized = any(task[0] == "init" for task in self._tasks)
+                    self._tasks = deque(task for task in self._tasks if task[0] != "track")
+                    self._backlog = 0
+                    self._condition.notify_all()
+
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+    @property
+    def backlog(self):
+        return self._backlog
+
+    @property
+    def skipped(self):
+        return self._skipped
+
+    @property
+    def initialized(self):
+        return self._initialized
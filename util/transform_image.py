@@ -1,6 +1,24 @@
 import numpy as np
 import cv2 as cv
 
+# keys of the config, which the image functions read, only these key the caches of converted frames
+TRANSFORM_KEYS = ("width", "height")
+
+
+def transform_config(config):
+    """
+    Get the part of the config, which the image functions read.
+
+    Arguments:
+        config {dict} -- config
+
+    Returns:
+        dict -- values of TRANSFORM_KEYS in the config
+    """
+
+    return {key: config[key] for key in TRANSFORM_KEYS if key in config}
+
+
 def resize_image(config, frame):
     width = config["width"]
     height = config["height"]